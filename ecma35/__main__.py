@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Command-line transcoder: python -m ecma35 [options] [file]
+# Decodes the file (or stdin) and writes the text (as simpletext gives it) to stdout (or the file
+# given by --output), in UTF-8 or the encoding given by --encoding. The input is read, and the text
+# written, a block at a time as it is decoded, so memory use doesn't grow with the size of the
+# input, making it usable in pipelines over large logs and suchlike.
+#
+# The initial DOCS (--docs) and designations (--designate, e.g. G1=ir087 or C1=ir077) are given by
+# name, and take effect as if their escape sequences preceded the input (with an IRR for a variant
+# other than the one which the escape sequence selects by itself), after those of any --profile.
+# The DOCS comes first, since switching DOCS would otherwise undo the designations. Designations
+# are refused in a DOCS whose filter doesn't pass escape sequences on to be interpreted (UTF-8, for
+# instance), where they would only be decoded as stray data or errors.
+# With --analyse, the report from analysis is written (as JSON) in place of the text. With --batch,
+# each file in a directory tree is decoded to a file beside it (see batchdecode), with the errors
+# in each, and the throughput overall, being written to stdout.
+
+import sys, os, json, codecs, argparse, contextlib
+from ecma35.decoder import tokenfeed, simpletext, inputprofiles
+
+_buffer_size = 0x100000
+_wsetbytes = {"94": {"G0": b"(", "G1": b")", "G2": b"*", "G3": b"+"},
+              "96": {"G1": b"-", "G2": b".", "G3": b"/"}}
+
+def docs_sequence(name):
+    from ecma35.decoder import docssequences
+    if name not in docssequences.docs_tokens:
+        raise ValueError("unknown DOCS: {!r} (known: {})".format(
+                         name, ", ".join(sorted(docssequences.docs_tokens))))
+    token = docssequences.docs_tokens[name]
+    return b"\x1B%" + (b"/" if token[1] else b"") + bytes(token[2])
+
+# The DOCS in which designations are interpreted: ECMA-35 itself, and those structured like it.
+_designating_docs = ("ecma-35", "shift_jis", "uhc", "gbk", "plainextascii", "bigfive",
+                     "bigfivenarrow", "elex", "modified-euc")
+
+def initial_docs(docs, profile):
+    # The DOCS in effect at the start of the input, given --docs and --profile.
+    from ecma35.decoder import docssequences
+    if docs:
+        return docs
+    prefix = inputprofiles.profiles[profile]["prefix"] if profile else b""
+    for name in docssequences.docs_tokens:
+        if prefix.startswith(docs_sequence(name)):
+            return name
+    return "ecma-35"
+
+# Identifying revisions for selecting the variants of a set (see graphsets.proc_irrset), by IRR.
+_irrs = [()] + [(i,) for i in range(0x30, 0x7F)] + [(0x20, i) for i in range(0x30, 0x7F)]
+
+def _find_set(tables, name):
+    from ecma35.decoder.graphsets import proc_irrset
+    for settype, table in tables:
+        for idbytes, entry in table.items():
+            if name == entry or (isinstance(entry, tuple) and (
+                    name == entry[0] or name in entry[1] or name in entry[2])):
+                for irr in _irrs:
+                    if proc_irrset(entry, irr) == name:
+                        return settype, idbytes, (b"\x1B&" + bytes(irr) if irr else b"")
+    raise ValueError("unknown set: {!r}".format(name))
+
+def designation_sequence(designation):
+    # The escape sequence for a designation given as (e.g.) G1=ir087, preceded by an IRR if the set
+    # named is a variant other than the preferred one for its escape sequence.
+    from ecma35.data import graphdata, controldata
+    wset, sep, name = designation.partition("=")
+    wset = wset.upper()
+    if wset in ("C0", "C1"):
+        table = controldata.c0bytes if wset == "C0" else controldata.c1bytes
+        settype, idbytes, irr = _find_set([(wset, table)], name)
+        return irr + b"\x1B" + (b"!" if wset == "C0" else b"\"") + bytes(idbytes)
+    elif wset not in ("G0", "G1", "G2", "G3"):
+        raise ValueError("not a working set: {!r}".format(wset))
+    settype, idbytes, irr = _find_set(graphdata.sumps.items(), name)
+    wsetbyte = _wsetbytes[settype.rstrip("n")].get(wset, None)
+    if wsetbyte is None:
+        raise ValueError("{} is a 96-character set, so cannot go in G0".format(name))
+    return irr + b"\x1B" + (b"$" if settype.endswith("n") else b"") + wsetbyte + bytes(idbytes)
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="python -m ecma35",
+                                     description="Decodes ECMA-35 (ISO 2022) and related formats.")
+    parser.add_argument("file", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-e", "--encoding", default="utf-8", help="output encoding")
+    parser.add_argument("--errors", default="replace", choices=("replace", "ignore", "strict"),
+                        help="handling of undecodable input, and of unencodable output")
+    parser.add_argument("--docs", help="initial DOCS, e.g. utf-8 or shift_jis")
+    parser.add_argument("--profile", choices=sorted(inputprofiles.profiles),
+                        help="input profile, leaving out the DOCS and stages which it doesn't "
+                             "need (see inputprofiles)")
+    parser.add_argument("--designate", action="append", default=[], metavar="WSET=SET",
+                        help="initial designation, e.g. G1=ir087 (may be repeated)")
+    parser.add_argument("--regard-bom", type=int, choices=(0, 1, 2), default=1,
+                        help="0: ignore byte order marks; 1: at the start of UTF data only; "
+                             "2: anywhere")
+    parser.add_argument("--default-endian", choices=("big", "little"), default="big",
+                        help="byte order of UTF-16 and UTF-32 data without a byte order mark")
+    parser.add_argument("--no-osc-bel-term", action="store_false", dest="osc_bel_term",
+                        help="do not accept BEL as terminating an OSC string")
+    parser.add_argument("--analyse", action="store_true",
+                        help="write a summary of what the input uses (as JSON), not the text")
+    parser.add_argument("--batch", action="store_true",
+                        help="decode every file in the directory given (in several processes), "
+                             "writing the text of each beside it")
+    parser.add_argument("--suffix", default=".decoded",
+                        help="added to the names of the files written by --batch")
+    parser.add_argument("--workers", type=int, help="processes for --batch (default: one per CPU)")
+    return parser
+
+def batch(args, prefix, options):
+    from ecma35.decoder import batchdecode
+    totals = batchdecode.Totals()
+    for result in batchdecode.decode_tree(args.file, suffix=args.suffix, encoding=args.encoding,
+                                          errors=args.errors, prefix=prefix, workers=args.workers,
+                                          **options):
+        totals.add(result)
+        if result["exception"]:
+            outcome = "failed: " + result["exception"]
+        else:
+            outcome = "{} errors".format(sum(result["errors"].values()))
+            if result["errors"]:
+                outcome += " ({})".format(", ".join("{} {}".format(kind, count)
+                                          for kind, count in sorted(result["errors"].items())))
+        print("{}: {}".format(result["source"], outcome), flush=True)
+    summary = totals.summary()
+    print("{files} files ({failed} failed), {megabytes:.2f} MB in {seconds:.2f} s: "
+          "{files_per_second:.2f} files/s, {megabytes_per_second:.3f} MB/s, {errorcount} errors"
+          .format(megabytes=summary["bytes"] / 1e6, errorcount=sum(summary["errors"].values()),
+                  **summary))
+    return 1 if summary["failed"] else 0
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    try:
+        codecs.lookup(args.encoding)
+    except LookupError as error:
+        parser.error(str(error))
+    try:
+        prefix = b"".join(([docs_sequence(args.docs)] if args.docs else []) +
+                          [designation_sequence(i) for i in args.designate])
+    except ValueError as error:
+        parser.error(str(error))
+    docs = initial_docs(args.docs, args.profile)
+    if args.designate and docs not in _designating_docs:
+        parser.error("designations are not interpreted in the {} DOCS".format(docs))
+    options = {"regard_bom": args.regard_bom, "osc_bel_term": args.osc_bel_term,
+               "default_endian": ">" if args.default_endian == "big" else "<",
+               "input_profile": args.profile}
+    if args.batch:
+        if args.file == "-" or not os.path.isdir(args.file):
+            parser.error("--batch needs a directory")
+        elif args.output != "-" or args.analyse:
+            parser.error("--batch writes its output beside each file, so takes no --output or "
+                         "--analyse")
+        elif not args.suffix:
+            parser.error("--suffix must not be empty, lest the output overwrite the input")
+        return batch(args, prefix, options)
+    try:
+        if args.file == "-":
+            # Left open, since it isn't ours to close.
+            infile = contextlib.nullcontext(sys.stdin.buffer)
+        else:
+            infile = open(args.file, "rb", buffering=_buffer_size)
+    except OSError as error:
+        print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+    try:
+        if args.output == "-":
+            outfile = open(sys.stdout.fileno(), "w", encoding=args.encoding, errors=args.errors,
+                           newline="", buffering=_buffer_size, closefd=False)
+        else:
+            outfile = open(args.output, "w", encoding=args.encoding, errors=args.errors,
+                           newline="", buffering=_buffer_size)
+    except OSError as error:
+        with infile:
+            print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+    try:
+        with infile as instream, outfile:
+            stream = tokenfeed.PrefixedStream(prefix, instream) if prefix else instream
+            if args.analyse:
+                from ecma35.decoder import analysis
+                json.dump(analysis.analyse(stream, **options), outfile, indent=1,
+                          ensure_ascii=False)
+                outfile.write("\n")
+            else:
+                lastfilter = simpletext.simple_text_chunker(args.errors)
+                for text in tokenfeed.process_stream(stream, lastfilter=lastfilter, **options):
+                    outfile.write(text)
+    except BrokenPipeError:
+        # The reader went away (e.g. head), so nothing more can be written, even when closing.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, UnicodeError) as error:
+        print("{}: {}".format(parser.prog, error), file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+
+
+
+
+
+
+
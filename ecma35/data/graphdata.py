@@ -6,7 +6,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
-import sys, os, urllib.parse, json, collections, shutil
+import sys, os, urllib.parse, json, collections, shutil, threading, types
 
 __all__ = [
     "codepoint_coverages", "gsets", "g94bytes", "g96bytes", "g94nbytes", "g96nbytes", "sumps",
@@ -21,32 +21,47 @@ cachedirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "covca
 if (os.environ.get("ECMA35LIBDECACHE", "") == "1") and os.path.exists(cachedirectory):
     shutil.rmtree(cachedirectory)
     os.makedirs(cachedirectory)
+# Coverages are worked out (or read from the cache) under a lock, so that threads looking up the
+# same one at once don't both work it out, nor read the cache file while another is writing it.
+# The cache file is written under a temporary name and then renamed, so other processes don't read
+# it half-written either. Each is a frozenset, since the one copy is handed to every caller.
 class CoveragesOnDemand(dict):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
     def __getitem__(self, label):
         if super().__contains__(label):
             return super().__getitem__(label)
-        path = os.path.join(cachedirectory, urllib.parse.quote(label, "") + ".json")
-        if not os.path.exists(path):
-            my_coverage = set()
-            kind, xbcs, codepoints = gsets[label]
-            for codeset in codepoints:
-                if isinstance(codeset, tuple):
-                    if len(codeset) != 1:
-                        continue
-                    codeset = codeset[0]
-                if isinstance(codeset, (list, tuple)): # i.e. STILL tuple (was double wrapped)
-                    raise ValueError(codepoints)
-                if codeset is not None:
-                    my_coverage |= {codeset}
-            f = open(path, "w")
-            f.write(json.dumps(sorted(my_coverage)))
-            f.close()
-        else:
-            f = open(path, "r")
-            my_coverage = set(json.load(f))
-            f.close()
-        self[label] = my_coverage
+        with self._lock:
+            if super().__contains__(label):
+                return super().__getitem__(label)
+            my_coverage = self._load(label)
+            super().__setitem__(label, my_coverage)
         return my_coverage
+    def _load(self, label):
+        path = os.path.join(cachedirectory, urllib.parse.quote(label, "") + ".json")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                return frozenset(json.load(f))
+        my_coverage = set()
+        kind, xbcs, codepoints = gsets[label]
+        for codeset in codepoints:
+            if isinstance(codeset, tuple):
+                if len(codeset) != 1:
+                    continue
+                codeset = codeset[0]
+            if isinstance(codeset, (list, tuple)): # i.e. STILL tuple (was double wrapped)
+                raise ValueError(codepoints)
+            if codeset is not None:
+                my_coverage |= {codeset}
+        temporary = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+        try:
+            with open(temporary, "w") as f:
+                f.write(json.dumps(sorted(my_coverage)))
+            os.replace(temporary, path)
+        except EnvironmentError:
+            pass
+        return frozenset(my_coverage)
 codepoint_coverages = CoveragesOnDemand()
 
 # Note: since gsets specifies length as second member, no more need for "94n" distinct from "94".
@@ -623,3 +638,26 @@ initial_is_96 = (0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
 workingsets = ("G0", "G1", "G2", "G3", "G4", "G5", "G6", "G7", "G8", "G9", "G10", "G11", "G12", "G13", "G14", "G15")
 assert len(initial_gsets) == len(initial_is_96) == len(workingsets)
 
+# Once everything is loaded, the registries are replaced with read-only views of themselves, so
+# that any number of pipelines, in any number of threads, can share them without one of them being
+# changed underfoot. For a set without flags, gsetflags gives an empty frozenset, rather than
+# adding one as the defaultdict did.
+class _FlagsDict(dict):
+    def __missing__(self, key):
+        return frozenset()
+
+def _freeze():
+    global gsets, gsetflags, c0graphics, lhses, rhses, defgsets, chcpdocs, ebcdicdbcs
+    global g94bytes, g96bytes, g94nbytes, g96nbytes, sumps
+    gsets, c0graphics, lhses, rhses, defgsets, chcpdocs, ebcdicdbcs = [
+            types.MappingProxyType(i)
+            for i in (gsets, c0graphics, lhses, rhses, defgsets, chcpdocs, ebcdicdbcs)]
+    gsetflags = types.MappingProxyType(_FlagsDict(
+            (setname, frozenset(flags)) for setname, flags in gsetflags.items()))
+    g94bytes, g96bytes, g94nbytes, g96nbytes = [
+            types.MappingProxyType(i) for i in (g94bytes, g96bytes, g94nbytes, g96nbytes)]
+    sumps = types.MappingProxyType({"94": g94bytes, "96": g96bytes, "94n": g94nbytes,
+                                    "96n": g96nbytes})
+
+_freeze()
+
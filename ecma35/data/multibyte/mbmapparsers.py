@@ -6,7 +6,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
-import sys, os, binascii, json, urllib.parse, shutil, itertools, collections.abc, re, urllib.parse, binascii
+import sys, os, binascii, json, urllib.parse, shutil, itertools, collections.abc, re, urllib.parse, binascii, threading
 from ecma35.data import gccdata
 from ecma35.data.names import namedata
 
@@ -55,17 +55,26 @@ def with_caching(f):
         return ret
     return inner
 
+# Loaded under a lock, and all at once, so that threads using the same mapping at once don't both
+# load it (doubling it up), nor see it half-loaded.
+_load_lock = threading.Lock()
+
 class LazyJSON(list):
     def __init__(self, filename, iscache=True):
+        self._loaded = False
         if iscache:
             self._filename = os.path.join(cachedirectory, filename)
         else:
             self._filename = os.path.join(directory, filename)
     def _load(self):
-        if not super().__len__():
-            f = open(self._filename)
-            super().extend(tuple(i) if isinstance(i, list) else i for i in json.load(f))
-            f.close()
+        if not self._loaded:
+            with _load_lock:
+                if not self._loaded:
+                    f = open(self._filename)
+                    data = [tuple(i) if isinstance(i, list) else i for i in json.load(f)]
+                    f.close()
+                    super().extend(data)
+                    self._loaded = True
     def __iter__(self):
         self._load()
         return super().__iter__()
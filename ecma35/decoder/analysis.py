@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Summary of what a document uses, made in one pass over its tokens without keeping them, so its
+# memory use doesn't grow with the length of the document (only with how many different things it
+# uses). analyse_tokens is a lastfilter giving only the report, once the tokens are exhausted;
+# analyse runs process_stream with it (or replay_stream, see tokenserial, for a saved stream).
+#
+# The report is a dict of:
+#   "tokens", "characters": how many of each there were (a COMPCHAR counting as one character).
+#   "docs": how many times each DOCS mode was switched to (including the initial one), by name, or
+#       by its escape sequence (after "unknown") if not recognised.
+#   "codepages": how many times each code page was selected (see chcpsequences).
+#   "designations": for each working set (G0 to G3, and C0 and C1), how many times each set was
+#       designated to it, by name, or by its type and escape sequence if not recognised.
+#   "errors": how many ERROR tokens there were of each kind (UTF8TRUNCATE, UNDEFGRAPH, &c).
+#   "private_use": for each set from which private-use characters were decoded, how many, with
+#       the lowest and highest code (as in the CHAR tokens, e.g. a row and cell) they came from.
+# The designations and DOCS tokens must reach the lastfilter, as must the ERROR tokens, so the
+# metadata and policy options should be left alone.
+
+import collections
+
+def _is_private_use(ucs):
+    return 0xE000 <= ucs < 0xF900 or 0xF0000 <= ucs < 0xFFFFE or 0x100000 <= ucs < 0x10FFFE
+
+def _escape(idbytes):
+    return "".join("[{:02X}]".format(i) for i in idbytes)
+
+def _count_private_use(private_use, token):
+    entry = private_use.get(token[2], None)
+    if entry is None:
+        private_use[token[2]] = {"count": 1, "lowest": token[3], "highest": token[3]}
+    else:
+        entry["count"] += 1
+        if token[3] < entry["lowest"]:
+            entry["lowest"] = token[3]
+        elif token[3] > entry["highest"]:
+            entry["highest"] = token[3]
+
+def analyse_tokens(stream, state):
+    from ecma35.decoder.graphsets import proc_irrset
+    docs, codepages, errors = collections.Counter(), collections.Counter(), collections.Counter()
+    designations = collections.defaultdict(collections.Counter)
+    private_use = {}
+    tokens = characters = 0
+    for token in stream:
+        tokens += 1
+        kind = token[0]
+        if kind == "CHAR":
+            characters += 1
+            if token[1] >= 0xE000 and _is_private_use(token[1]):
+                _count_private_use(private_use, token)
+        elif kind == "COMPCHAR":
+            characters += 1
+            for part in token[2]:
+                if part[0] == "CHAR" and _is_private_use(part[1]):
+                    _count_private_use(private_use, part)
+        elif kind == "ERROR":
+            errors[token[1]] += 1
+        elif kind == "RDESIG":
+            name = proc_irrset(token[2], token[6])
+            if name is None: # Unrecognised IRR, which graphsets gives an ERROR for.
+                name = token[2][0] if isinstance(token[2], tuple) else token[2]
+            designations[token[1]][name] += 1
+        elif kind == "DESIG":
+            designations["G{}".format(token[1])]["unknown {} {}".format(
+                    token[2], _escape(token[3]))] += 1
+        elif kind == "RDOCS":
+            docs[token[1]] += 1
+        elif kind == "DOCS":
+            docs["unknown {}{}".format("/" if token[1] else "", _escape(token[2]))] += 1
+        elif kind == "CHCP":
+            codepages[token[1]] += 1
+    yield {"tokens": tokens, "characters": characters, "docs": dict(docs),
+           "codepages": dict(codepages),
+           "designations": {wset: dict(counts) for wset, counts in sorted(designations.items())},
+           "errors": dict(errors), "private_use": private_use}
+
+def analyse(stream, **kwargs):
+    # The report for a binary stream (or bytes, &c, as with process_stream).
+    from ecma35.decoder import tokenfeed
+    report, = tokenfeed.process_stream(stream, lastfilter=analyse_tokens, **kwargs)
+    return report
+
+
+
+
+
+
+
+
+
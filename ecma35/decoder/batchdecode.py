@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Decodes every file in a directory tree across several processes, writing the text of each beside
+# it (under the same name with a suffix added), for converting whole trees of legacy files. Unlike
+# paralleldecode, which splits one large file, each file here is decoded whole by one worker.
+#
+# Loading graphdata (and planning the pipeline) takes far longer than decoding a typical file, so
+# each worker does so once, when it starts, rather than for each file; the workers are then kept
+# for the whole tree. Each file is decoded as a stream, its text being written out as it goes, so
+# a worker's memory use doesn't grow with the size of the files. Only so many files are handed out
+# ahead of the workers, so neither does the main process's with the number of files.
+#
+# decode_tree yields a result (a dict) for each file as it finishes, giving its "source" and
+# "target" filenames, its size in "bytes" (None if it couldn't be opened), the "seconds" its
+# decoding took, the count of each kind of ERROR token in "errors", and, if its decoding failed
+# outright, the "exception" (as a string) and no target. Totals adds these up, and works out the
+# throughput.
+
+import os, time, collections, concurrent.futures
+
+_options = None
+
+def _init_worker(kwargs):
+    global _options
+    from ecma35.data import graphdata # Paid for once per worker, here.
+    from ecma35.decoder import tokenfeed
+    _options = kwargs
+    tokenfeed.decode(b"", **kwargs) # Imports the filters and plans the pipeline.
+
+def _error_counter(errors):
+    def count_errors(stream, state):
+        for token in stream:
+            if token[0] == "ERROR":
+                errors[token[1]] += 1
+            yield token
+    return count_errors
+
+def _decode_file(source, target, prefix, encoding, errors):
+    from ecma35.decoder import tokenfeed, simpletext
+    counts = collections.Counter()
+    count_errors = _error_counter(counts)
+    chunker = simpletext.simple_text_chunker(errors)
+    def lastfilter(stream, state):
+        return chunker(count_errors(stream, state), state)
+    lastfilter.accepts_char_runs = True
+    start = time.perf_counter()
+    size = None # Stays None if the source can't be opened (e.g. it was removed meanwhile).
+    try:
+        with open(source, "rb") as infile:
+            size = os.fstat(infile.fileno()).st_size
+            with open(target, "w", encoding=encoding, errors=errors, newline="") as outfile:
+                stream = tokenfeed.PrefixedStream(prefix, infile) if prefix else infile
+                for text in tokenfeed.process_stream(stream, lastfilter=lastfilter, **_options):
+                    outfile.write(text)
+    except Exception as error:
+        if size is not None and os.path.exists(target):
+            os.remove(target)
+        target, exception = None, "{}: {}".format(type(error).__name__, error)
+    else:
+        exception = None
+    return {"source": source, "target": target, "bytes": size,
+            "seconds": time.perf_counter() - start, "errors": dict(counts),
+            "exception": exception}
+
+def find_files(directory, suffix):
+    # The files in the tree, besides those already ending with the suffix (i.e. earlier output).
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.endswith(suffix):
+                yield os.path.join(dirpath, filename)
+
+def decode_tree(directory, *, suffix=".decoded", encoding="utf-8", errors="replace", prefix=b"",
+                workers=None, **kwargs):
+    # The text is written in the given encoding, with errors (both in decoding and encoding)
+    # handled as given, and the prefix read before each file (see tokenfeed.PrefixedStream). The
+    # remaining options are those of process_stream.
+    if not suffix:
+        # Every file would be taken for earlier output, and the output would overwrite the input.
+        raise ValueError("suffix must not be empty")
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(kwargs,)) as executor:
+        pending = set()
+        for source in find_files(directory, suffix):
+            if len(pending) >= workers * 4:
+                done, pending = concurrent.futures.wait(
+                        pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(_decode_file, source, source + suffix, prefix,
+                                       encoding, errors))
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+class Totals(object):
+    # Running totals and throughput for the results of decode_tree, timed from when it was made.
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = self.bytes = self.failed = 0
+        self.errors = collections.Counter()
+    #
+    def add(self, result):
+        self.files += 1
+        self.bytes += result["bytes"] or 0
+        self.failed += bool(result["exception"])
+        self.errors.update(result["errors"])
+    #
+    def summary(self):
+        seconds = time.perf_counter() - self.start
+        return {"files": self.files, "bytes": self.bytes, "seconds": seconds,
+                "files_per_second": self.files / seconds,
+                "megabytes_per_second": self.bytes / 1e6 / seconds,
+                "failed": self.failed, "errors": dict(self.errors)}
+    #
+#
+
+
+
+
+
+
+
+
+
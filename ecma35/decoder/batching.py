@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Batched token protocol, enabled by default (batched=False turns it off) for the earlier stages of
+# the pipeline, where the tokens are mostly one per byte.
+#
+# A batch is still passed as a single token, so the filters stay in step with one another exactly
+# as they do otherwise (a filter only pulls its next token once the later ones have finished with
+# the previous one, which the feedback to the tokeniser and the state shared between the filters
+# rely upon). There are two kinds:
+#   ("WORDS", bytes) from the tokeniser, standing for a WORD token for each byte.
+#   ("BATCH", tokens) from the DOCS filters onwards, standing for the tokens in the tuple.
+#
+# The tokeniser only batches a run of words which the DOCS filter owning the active docsmode has
+# indicated (by a word_runs attribute, a compiled bytes pattern) it can decode to tokens which
+# none of the stages up to the end of the batched segment would act upon, besides passing them on:
+# complete characters, and no controls, DEL or surrogates. Nor does it batch while
+# any filter which gives feedback at the end of a sequence is partway through one (these list
+# themselves in state.batch_holds meanwhile), so the feedback is never held up behind a batch. Since
+# the tokeniser is only pulled from once the later filters are done with the previous token, any
+# change of docsmode or bytewidth has taken effect by the time it next starts a run. A run also
+# ends at the end of the data read so far, so batching never waits on input.
+#
+# The filters in the batched segment say so by having a true handles_batches attribute. Any of them
+# partway through something (an escape sequence, for instance) when a batch arrives takes its
+# contents one at a time, which always gives the same as the batch not having been made. The first
+# filter not handling batches gets them by way of expand_batches, after which the tokens are the
+# same as ever; per_token does the same for a single filter, e.g. one used on its own.
+
+def contents(token, state):
+    # The tokens which a WORDS or BATCH token stands for.
+    if token[0] == "BATCH":
+        return token[1]
+    return tuple(("WORD", i) for i in token[1])
+
+def expand_batches(stream, state):
+    for token in stream:
+        if token[0] in ("WORDS", "BATCH"):
+            yield from contents(token, state)
+        else:
+            yield token
+
+def per_token(f):
+    # Adapter for a filter which knows nothing of batches.
+    def adapted(stream, state):
+        return f(expand_batches(stream, state), state)
+    adapted.__name__ = f.__name__
+    adapted.__module__ = f.__module__
+    adapted.handles_batches = True
+    return adapted
+
+
+
+
+
+
+
+
+
@@ -117,6 +117,9 @@ def decode_bigfive(stream, state):
     #
 #
 
+decode_bigfive.docsmodes = ("bigfive", "bigfivenarrow")
+
+
 
 
 
@@ -9,6 +9,9 @@
 from ecma35.data.gccdata import bs_handle
 
 def proc_bs_sequences(stream, state):
+    # A run of overstrikes (character, backspace, character, &c) longer than overstrike_cap tokens
+    #   is given up on, in an ERROR, rather than held back until it ends.
+    cap = state.overstrike_cap
     mode = "normal"
     reconsume = None
     stack = []
@@ -22,10 +25,22 @@ def proc_bs_sequences(stream, state):
             if stack:
                 yield from stack
             yield token
+        elif token[0] == "CHARS" and not stack:
+            # Only the last might be followed by a backspace.
+            if len(token[1]) > 1:
+                yield ("CHARS", token[1][:-1])
+            stack.append(token[1][-1])
+        elif token[0] == "CHARS" and not (len(stack) % 2):
+            stack.append(token[1][0])
+            if len(token[1]) > 1:
+                reconsume = ("CHARS", token[1][1:])
         elif token[0] in ("CHAR", "COMPCHAR") and not (len(stack) % 2):
             stack.append(token)
         elif token[:2] == ("CTRL", "BS") and len(stack) % 2:
             stack.append(token)
+            if cap is not None and len(stack) > cap:
+                yield ("ERROR", "OVERSTRIKECAP", tuple(stack))
+                stack.clear()
         elif stack:
             if len(stack) <= 2 or any(i[0] == "CHAR" and i[1] < 0 for i in stack) or any(
                     i[0] == "COMPCHAR" and
@@ -23,3 +23,6 @@ def decode_chcp(stream, state):
         else:
             yield token
 
+decode_chcp.handles_batches = True
+
+
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Checkpoint index for random access into a decoded file, so showing what is at a given offset
+# doesn't need decoding everything before it. build_index makes one full pass, recording the
+# decoder state (the docsmode, designations, invocations, control sets, DOCS stack and so forth)
+# every so many bytes, and writes it to a sidecar file; seek restores the nearest checkpoint at or
+# before a given offset and resumes decoding from there.
+#
+# Any partial sequence pending at a given point lives in the local variables of a filter's generator
+# rather than in the state, so cannot be recorded. Checkpoints are therefore only taken just after
+# a line feed, where there is usually nothing pending, and each one is checked by resuming from it
+# for a window of the file, whose tokens and state at the end must match those from the full pass.
+# Candidates failing that check are dropped in favour of a later line feed.
+#
+# The sidecar holds one Python literal per line (since the state contains tuples, which JSON would
+# turn into lists): a header dict, then (offset, token count, state) for each checkpoint.
+
+import os, mmap, ast
+from ecma35.decoder import tokenfeed
+
+_version = 1
+_excluded = ("feedback", "resume_state", "checkpoint_hook", "profile", "batch_holds")
+
+def _passthrough(stream, state):
+    return stream
+
+def _state_snapshot(state):
+    snapshot = {key: value for key, value in vars(state).items() if key not in _excluded}
+    # Only state which survives being written out and read back in can be checkpointed. The copy
+    # read back in is used, since the live state contains lists which go on being changed.
+    try:
+        copied = ast.literal_eval(repr(snapshot))
+        if copied == snapshot:
+            return copied
+    except (ValueError, SyntaxError):
+        pass
+    return None
+
+def _resume(stream, snapshot, kwargs, lastfilter):
+    state = tokenfeed._make_state(dict(kwargs, resume_state=snapshot))
+    return state, tokenfeed._build_pipeline(stream, state, lastfilter)
+
+def sidecar_name(filename):
+    return filename + ".ecma35idx"
+
+class _IndexBuilder(object):
+    def __init__(self, data, interval, window, kwargs):
+        self.data = data
+        self.interval = interval
+        self.window = window
+        self.kwargs = kwargs
+        self.state = None
+        self.due = interval
+        self.count = 0 # Tokens given by the full pass so far.
+        self.candidate = None
+        self.tokens = [] # Tokens given by the full pass since the candidate.
+        self.checkpoints = []
+    #
+    def collect(self, stream, state):
+        for token in stream:
+            self.count += 1
+            if self.candidate is not None:
+                self.tokens.append(token)
+            yield token
+    #
+    def hook(self, offset):
+        bytewidth = self.state.bytewidth
+        if not offset or 0x0A not in self.data[max(offset - bytewidth, 0):offset]:
+            return
+        if self.candidate is not None and offset >= self.candidate[0] + self.window:
+            self.verify(offset)
+        if self.candidate is None and offset >= self.due:
+            snapshot = _state_snapshot(self.state)
+            if snapshot is not None:
+                self.candidate = (offset, self.count, snapshot)
+    #
+    def verify(self, offset):
+        start, count, snapshot = self.candidate
+        state, pipeline = _resume(self.data[start:offset], snapshot, self.kwargs, _passthrough)
+        try:
+            tokens = list(pipeline)
+        except Exception:
+            # Resuming from a state which doesn't capture everything pending (partway through a
+            # UTF-16 sequence with a byte order mark still to come, say) can trip up the filters
+            # in ways the full pass never would, which rules the candidate out like any mismatch.
+            tokens = None
+        # The resumed pass ends with an ENDSTREAM where the full pass instead carries on.
+        if tokens is not None and tokens[:-1] == self.tokens and (
+                _state_snapshot(state) == _state_snapshot(self.state)):
+            self.checkpoints.append(self.candidate)
+            self.due = start + self.interval
+        self.candidate = None
+        self.tokens = []
+    #
+#
+
+def build_index(filename, *, interval=0x100000, window=0x1000, sidecar=None, **kwargs):
+    # Returns the checkpoints, also writing them to the sidecar file (unless sidecar is False).
+    if sidecar is None:
+        sidecar = sidecar_name(filename)
+    with open(filename, "rb") as f:
+        if os.path.getsize(filename):
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = b""
+        try:
+            builder = _IndexBuilder(data, interval, window, kwargs)
+            state = builder.state = tokenfeed._make_state(dict(kwargs,
+                                                               checkpoint_hook=builder.hook))
+            # The mapping is read in place.
+            for token in tokenfeed._build_pipeline(data, state, builder.collect):
+                pass
+        finally:
+            if data:
+                data.close()
+    if sidecar:
+        write_index(sidecar, builder.checkpoints, interval=interval,
+                    size=os.path.getsize(filename))
+    return builder.checkpoints
+
+def write_index(sidecar, checkpoints, **header):
+    with open(sidecar, "w", encoding="utf-8") as f:
+        f.write(repr(dict(header, version=_version)) + "\n")
+        for checkpoint in checkpoints:
+            f.write(repr(checkpoint) + "\n")
+
+def read_index(sidecar):
+    with open(sidecar, "r", encoding="utf-8") as f:
+        header = ast.literal_eval(f.readline())
+        if header.get("version") != _version:
+            raise ValueError("unsupported checkpoint index version: {!r}".format(
+                             header.get("version")))
+        return [ast.literal_eval(line) for line in f if line.strip()]
+
+def seek(stream, offset, checkpoints, *, lastfilter=None, **kwargs):
+    # Seeks the (seekable, binary) stream to the nearest checkpoint at or before offset, returning
+    # that checkpoint's offset, the count of tokens preceding it in the full pass, and the tokens
+    # from there on (passed to lastfilter, as with process_stream). If there is no such checkpoint,
+    # decoding starts from the beginning.
+    best = None
+    for checkpoint in checkpoints:
+        if checkpoint[0] <= offset and (best is None or checkpoint[0] > best[0]):
+            best = checkpoint
+    if best is None:
+        stream.seek(0)
+        return 0, 0, tokenfeed.process_stream(stream, lastfilter=lastfilter, **kwargs)
+    start, count, snapshot = best
+    stream.seek(start)
+    state, pipeline = _resume(stream, snapshot, kwargs, lastfilter)
+    return start, count, pipeline
+
+def seek_file(filename, offset, *, lastfilter=None, **kwargs):
+    # As seek, but opening the file and reading its sidecar, building the sidecar if missing.
+    sidecar = sidecar_name(filename)
+    if not os.path.exists(sidecar):
+        build_index(filename, sidecar=sidecar, **kwargs)
+    checkpoints = read_index(sidecar)
+    stream = open(filename, "rb")
+    start, count, pipeline = seek(stream, offset, checkpoints, lastfilter=lastfilter, **kwargs)
+    def tokens():
+        with stream:
+            yield from pipeline
+    return start, count, tokens()
+
+
+
+
+
+
+
+
@@ -71,6 +71,10 @@ def decode_control_sets(stream, state):
         else:
             yield token
 
+# Batches hold no control characters, so can be passed along as they are.
+decode_control_sets.handles_batches = True
+
+
 
 
 
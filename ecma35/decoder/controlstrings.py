@@ -14,6 +14,7 @@ def decode_control_strings(stream, state):
     parbytes = []
     mode = "normal"
     reconsume = None
+    cap = state.ctrlstring_cap
     while 1:
         try:
             token = (next(stream) if reconsume is None else reconsume)
@@ -27,11 +28,14 @@ def decode_control_strings(stream, state):
             else:
                 yield token # Pass everything else through
         else:
-            assert mode == "string"
+            # Once a string is longer than ctrlstring_cap tokens, it is given up on, in an ERROR,
+            #   and the rest of it is skipped rather than held.
+            assert mode in ("string", "skipping")
             if token[0] == "CTRL" and (token[1] == "ST" or
                     (token[1] == "BEL" and active[0][1] == "OSC" and state.osc_bel_term)):
-                active.append(token)
-                yield ("CTRLSTRING", active[0][1], tuple(active))
+                if mode == "string":
+                    active.append(token)
+                    yield ("CTRLSTRING", active[0][1], tuple(active))
                 del active[:]
                 mode = "normal"
             elif token[0] == "ENDSTREAM":
@@ -39,10 +43,14 @@ def decode_control_strings(stream, state):
                 yield ("ERROR", "TRUNCSEQ", tuple(active))
                 yield token
                 return
-            else:
+            elif mode == "string":
                 active.append(token)
-            
-            
+                if cap is not None and len(active) > cap:
+                    yield ("ERROR", "CTRLSTRINGCAP", tuple(active))
+                    del active[1:]
+                    mode = "skipping"
+
+
 
 
 
@@ -50,4 +58,3 @@ def decode_control_strings(stream, state):
 
 
 
-                
\ No newline at end of file
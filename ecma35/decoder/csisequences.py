@@ -6,6 +6,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import collections
 from ecma35.data import controldata, graphdata
 
 def decode_csi_sequences(stream, state):
@@ -15,13 +16,23 @@ def decode_csi_sequences(stream, state):
     parbytes = []
     mode = "normal"
     reconsume = None
+    backlog = collections.deque()
+    held = False
     while 1:
+        if held != (mode != "normal"):
+            # No batches from the tokeniser while partway through a sequence (see batching).
+            held = (mode != "normal")
+            (state.batch_holds.add if held else state.batch_holds.discard)("csi")
         try:
-            token = (next(stream) if reconsume is None else reconsume)
+            token = (reconsume if reconsume is not None else
+                     backlog.popleft() if backlog else next(stream))
         except StopIteration:
             break
         reconsume = None
-        if mode == "normal":
+        if token[0] == "BATCH" and mode != "normal":
+            # Taken one at a time when partway through a sequence.
+            backlog.extend(token[1])
+        elif mode == "normal":
             if (token[0] == "CTRL") and (token[1] in ("CSI",)):
                 active.append(token)
                 mode = "csi"
@@ -47,7 +58,7 @@ def decode_csi_sequences(stream, state):
                 # Space is exceptionally not treated the same as DEL here.
                 token = ("G0", 0, "GL")
             # Not elif:
-            bytevalue = token[1] + 0x20 if isinstance(token[1], int) else None
+            bytevalue = token[1] + 0x20 if len(token) > 1 and isinstance(token[1], int) else None
             if token[0] in workingsets and token[2] == "GL" and (0x30 <= bytevalue < 0x40) and (mode != "csinoparam"):
                 active.append(token)
                 parbytes.append(bytevalue)
@@ -115,6 +126,9 @@ def decode_csi_sequences(stream, state):
                 mode = "normal"
                 reconsume = savetoken
                 continue
+
+decode_csi_sequences.handles_batches = True
+
             
             
 
@@ -6,6 +6,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import collections
 from ecma35.data import graphdata
 
 def decode_designations(stream, state):
@@ -13,13 +14,18 @@ def decode_designations(stream, state):
     reconsume = None
     irrset = None
     inesc = False
+    backlog = collections.deque()
     while 1:
         try:
-            token = (next(stream) if reconsume is None else reconsume)
+            token = (reconsume if reconsume is not None else
+                     backlog.popleft() if backlog else next(stream))
         except StopIteration:
             break
         reconsume = None
-        if token[0] == "ESC" and token[1] in tuple(b"()*+-./$"):
+        if token[0] == "BATCH" and irrset is not None:
+            # Taken one at a time while awaiting the designation following an IRR.
+            backlog.extend(token[1])
+        elif token[0] == "ESC" and token[1] in tuple(b"()*+-./$"):
             inesc = False
             if token[1] in tuple(b"()*+"):
                 settype = "94"
@@ -83,6 +89,9 @@ def decode_designations(stream, state):
             inesc = False
             yield token
 
+decode_designations.handles_batches = True
+
+
 
 
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Stands in for the chain of DOCS filters, routing WORD tokens straight to the filter which owns
+# the current state.docsmode, rather than through every DOCS filter in turn (all but one of which
+# would merely pass them on unchanged).
+#
+# Each DOCS filter registers the docsmode names it owns as a docsmodes attribute of the filter
+# function, and optionally a consumes attribute listing any further token types which it acts on
+# even when its docsmode is not active (such as utf16filter taking surrogates from upstream).
+# Tokens other than WORD (or WORDS, see batching) still go through the whole chain, in the same
+# order as before.
+#
+# A filter not owning the active docsmode (or only having just taken ownership of it) is relied
+# upon to pass through unrecognised tokens immediately and without side effects. A marker token is
+# sent after each routed token, so as to tell when the filters it went through have finished with
+# it (since filters only ever pull their next token when done with the previous one).
+#
+# For the same reason, a filter which has never owned the active docsmode would do nothing but pass
+# on whatever reaches it, up until the RDOCS which makes it the owner. So the filters are only
+# started (and linked into the chain) upon such an RDOCS arriving from upstream, save for those
+# having a consumes attribute, which are started at the outset. This saves starting and passing
+# tokens through filters for DOCS which never appear, which would otherwise make up much of the
+# cost of decoding a short document.
+
+import collections, bisect
+
+_marker = ("DOCSROUTERMARK",)
+# Token types which have effect on DOCS filters other than the one owning the active docsmode.
+_always_routed = ("DOCS", "RDOCS", "ENDSTREAM")
+
+class _DocsFeed(object):
+    __slots__ = ("queue", "source")
+    def __init__(self):
+        self.queue = collections.deque()
+        self.source = self._unrouted
+    def __iter__(self):
+        return self
+    def __next__(self):
+        if self.queue:
+            return self.queue.popleft()
+        return self.source()
+    def _unrouted(self):
+        raise AssertionError("DOCS filter pulled a token beyond those routed to it")
+
+def docs_router_maker(filters):
+    filters = tuple(filters)
+    owners = {}
+    for index, f in enumerate(filters):
+        for docsmode in f.docsmodes:
+            assert docsmode not in owners, docsmode
+            owners[docsmode] = index
+    # Token types to be sent through the filters following each given owner.
+    routed_after = []
+    for index in range(len(filters)):
+        routed = set(_always_routed)
+        for f in filters[index + 1:]:
+            routed.update(getattr(f, "consumes", ()))
+        routed_after.append(frozenset(routed))
+    # Those acting on tokens besides those for their own docsmodes are started up front.
+    eager = [index for index, f in enumerate(filters) if hasattr(f, "consumes")]
+    #
+    def docs_router(stream, state):
+        feeds = [_DocsFeed() for f in filters]
+        outs = [None] * len(filters)
+        chain_sources = [feed.source for feed in feeds]
+        live = [] # Indices of the filters started so far.
+        express = [None] # Index of the filter whose feed has an express source installed.
+        #
+        def start(index):
+            # Starts a filter, linking it into the chain between the started ones either side.
+            outs[index] = filters[index](feeds[index], state)
+            position = bisect.bisect(live, index)
+            live.insert(position, index)
+            if position:
+                chain_sources[index] = outs[live[position - 1]].__next__
+                feeds[index].source = chain_sources[index]
+            if position + 1 < len(live):
+                following = live[position + 1]
+                chain_sources[following] = outs[index].__next__
+                if express[0] != following:
+                    feeds[following].source = chain_sources[following]
+        #
+        def admit(token):
+            # Starts a dormant filter before an RDOCS which will make it active reaches it.
+            if token[0] == "RDOCS":
+                index = owners.get(token[1], None)
+                if index is not None and outs[index] is None:
+                    start(index)
+            return token
+        #
+        for index in eager:
+            start(index)
+        #
+        def run_through(first, last, token):
+            # Sends a token through the started filters in filters[first:last + 1], yielding the
+            # results.
+            first = bisect.bisect_left(live, first)
+            last = bisect.bisect_right(live, last) - 1
+            if first > last:
+                yield token
+                return
+            feeds[live[first]].queue.extend((token, _marker))
+            out = outs[live[last]]
+            while 1:
+                result = next(out)
+                if result is _marker:
+                    return
+                yield result
+        #
+        def express_source_maker(owner):
+            def express_source():
+                while 1:
+                    if owners.get(state.docsmode) != owner:
+                        # Only reached once the owner has finished with the previous token, so
+                        # it can now be safely bypassed. Passing the marker out tells the router.
+                        return _marker
+                    token = admit(next(stream))
+                    if token[0] in ("WORD", "WORDS"):
+                        return token
+                    results = list(run_through(0, owner - 1, token))
+                    if results:
+                        feeds[owner].queue.extend(results[1:])
+                        return results[0]
+            return express_source
+        express_sources = [express_source_maker(index) for index in range(len(filters))]
+        #
+        current = None
+        while 1:
+            if current is None:
+                current = owners.get(state.docsmode, None)
+                if current is None:
+                    # No registered owner, so everything goes through the whole chain.
+                    try:
+                        token = admit(next(stream))
+                    except StopIteration:
+                        break
+                    index = owners.get(state.docsmode, None)
+                    if index is not None and outs[index] is None:
+                        # Active without its RDOCS having been seen, i.e. the tokeniser has just
+                        # resumed from a checkpoint.
+                        start(index)
+                    yield from run_through(0, len(filters) - 1, token)
+                    continue
+                if outs[current] is None:
+                    # Likewise, e.g. an initial docsmode given as an option.
+                    start(current)
+                feeds[current].source = express_sources[current]
+                express[0] = current
+                out = outs[current]
+                routed = routed_after[current]
+            try:
+                token = next(out)
+            except StopIteration:
+                break
+            if token is _marker:
+                feeds[current].source = chain_sources[current]
+                express[0] = current = None
+            elif token[0] in routed:
+                yield from run_through(current + 1, len(filters) - 1, token)
+            else:
+                yield token
+            #
+        #
+    docs_router.handles_batches = True
+    return docs_router
+
+
+
+
+
+
+
@@ -43,6 +43,14 @@ utf32docs = (("DOCS", True, (0x41,)), # Deprecated (UCS-4 level 1)
              ("DOCS", True, (0x46,))) # Current (still in ISO/IEC 10646 for UTF-32be)
 rawdocs = ("DOCS", True, (0x42,))
 
+# The DOCS for switching to each docsmode recognised here (the current one, where several are).
+docs_tokens = {"shift_jis": shiftjisdocs, "uhc": uhcdocs, "gbk": gbkdocs,
+               "plainextascii": plainextasciidocs, "bigfive": bigfivedocs,
+               "bigfivenarrow": bigfivenarrowdocs, "elex": elexdocs, "modified-euc": modeucdocs,
+               "scsu": scsudocs, "ebcdic": ebcdicdocs, "ecma-35": ecma35docs, "utf-1": utf1docs,
+               "utf-8": utf8docs[0], "utf-16": utf16docs[-1], "utf-32": utf32docs[-1],
+               "raw": rawdocs}
+
 def decode_docs_sequences(stream, state):
     for token in stream:
         if token == shiftjisdocs:
@@ -91,4 +99,8 @@ def proc_docs_sequence_stack(stream, state):
                 state.docs_sequence_stack.append(state.docsmode or "ecma-35")
             yield token
 
+decode_docs_sequences.handles_batches = True
+proc_docs_sequence_stack.handles_batches = True
+
+
 
@@ -205,6 +205,9 @@ def decode_ebcdic(stream, state):
     #
 #
 
+decode_ebcdic.docsmodes = ("ebcdic",)
+
+
 
 
 
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Registers the decoder as a Python codec (upon import), so that e.g. bytes.decode("ecma35") and
+# open(..., encoding="ecma35-shift_jis") work. Decoding only: encoding anything but an empty string
+# raises a UnicodeEncodeError (whatever the error handler, since it would have nothing to encode its
+# replacement with either). The codecs still have an encoder and an IncrementalEncoder, since
+# io.TextIOWrapper needs the latter for any writable buffer, even if only reading from it.
+#
+# The codec names are "ecma35" and "ecma35-" followed by the name of a preset, which starts the
+# decoder in a given DOCS or with given designations, by way of the escape sequences which would
+# select them (so the file needn't include them itself), and with any options it gives for the
+# decoder (for the UTF-16 and UTF-32 presets, the byte order assumed, short of a UTF-16 byte order
+# mark saying otherwise). The text is given as by simpletext.
+#
+# The IncrementalDecoder (as used by io.TextIOWrapper) keeps a push-mode Decoder, so the filters
+# and their state are kept from one chunk to the next rather than being built afresh for each, and
+# only as much data is held as the filters are partway through. Its state can't be captured, so
+# getstate() always reports a fresh start: TextIOWrapper.tell() is only reliable where nothing was
+# pending, and seeking other than to the start isn't supported.
+#
+# Positions in the input aren't tracked, so error handlers are given a UnicodeDecodeError whose
+# object is only the bytes which the ERROR token stands for (spanning the whole of it), where the
+# token shows what they were: the bytes of a malformed UTF-8 (or UTF-1, or UTF-EBCDIC) sequence,
+# the GL or GR codes of an undefined or truncated multibyte character, or the lead byte of a
+# truncated two-byte code. Where it doesn't (e.g. a truncated escape sequence), the error is
+# replaced with U+FFFD, short of the strict handler, which raises a UnicodeDecodeError naming the
+# kind of error in place of a position.
+
+import codecs
+from ecma35.decoder import tokenfeed, simpletext
+
+presets = {
+    "": (b"", {}),
+    "utf_8": (b"\x1B%G", {}),
+    "utf_16_be": (b"\x1B%/L", {"default_endian": ">"}),
+    "utf_16_le": (b"\x1B%/L", {"default_endian": "<"}),
+    "utf_32_be": (b"\x1B%/F", {"default_endian": ">"}),
+    "utf_32_le": (b"\x1B%/F", {"default_endian": "<"}),
+    "shift_jis": (b"\x1B%0", {}),
+    "uhc": (b"\x1B%1", {}),
+    "gbk": (b"\x1B%2", {}),
+    "big5": (b"\x1B%4", {}),
+    "euc_jp": (b"\x1B$)B\x1B*I\x1B$+D", {}),
+    "euc_kr": (b"\x1B$)C", {}),
+    "euc_cn": (b"\x1B$)A", {}),
+}
+
+def _normalise(name):
+    return name.lower().replace("-", "_").replace(" ", "_")
+
+_range_offsets = {"GL": 0x20, "GR": 0xA0}
+_lead_truncations = frozenset(("SJISTRUNC", "UHCTRUNCATE", "GBKTRUNCATE", "BIG5TRUNCATE",
+                               "ELEXTRUNCATE"))
+
+def _error_bytes(token):
+    # The input bytes which an ERROR token stands for, or b"" where it doesn't show them.
+    kind = token[1]
+    try:
+        if kind.startswith(("UTF8", "UTF1", "UTFEBCDIC")) and isinstance(token[2], tuple):
+            return bytes(token[2])
+        elif kind in ("TRUNCMB", "UNDEFGRAPH") and len(token) > 5 and (
+                token[5] in _range_offsets):
+            return bytes(_range_offsets[token[5]] + code for code in token[3])
+        elif kind == "OUTSIDE94" and token[4] in _range_offsets:
+            return bytes((_range_offsets[token[4]] + token[3],))
+        elif kind in _lead_truncations:
+            return bytes((token[2][1] if isinstance(token[2], tuple) else token[2],))
+    except (TypeError, ValueError, IndexError):
+        pass
+    return b""
+
+class _UnplacedDecodeError(UnicodeDecodeError):
+    # For an error whose bytes aren't known, so has no position to give.
+    def __str__(self):
+        return "{!r} codec can't decode the input: {}".format(self.encoding, self.reason)
+
+def _error_handler(encoding, errors):
+    if errors in ("replace", "ignore"):
+        return errors
+    handler = codecs.lookup_error(errors)
+    def on_error(token):
+        data = _error_bytes(token)
+        if data:
+            exception = UnicodeDecodeError(encoding, data, 0, len(data), str(token[1]))
+            replacement, position = handler(exception)
+            return replacement
+        elif errors == "strict":
+            raise _UnplacedDecodeError(encoding, b"", 0, 0, str(token[1]))
+        return "\uFFFD"
+    return on_error
+
+def _refuse_encoding(encoding, input):
+    if input:
+        raise UnicodeEncodeError(encoding, input, 0, len(input),
+                                 "the ECMA-35 codecs can only decode")
+    return b""
+
+def _codec_info(preset):
+    encoding = "ecma35-" + preset if preset else "ecma35"
+    prefix, kwargs = presets[preset]
+    def encode(input, errors="strict"):
+        return _refuse_encoding(encoding, input), 0
+    class IncrementalEncoder(codecs.IncrementalEncoder):
+        def encode(self, input, final=False):
+            return _refuse_encoding(encoding, input)
+    def decode(input, errors="strict"):
+        input = bytes(input)
+        text = tokenfeed.decode(prefix + input, errors=_error_handler(encoding, errors), **kwargs)
+        return text, len(input)
+    class IncrementalDecoder(codecs.IncrementalDecoder):
+        def __init__(self, errors="strict"):
+            codecs.IncrementalDecoder.__init__(self, errors)
+            self._decoder = None
+        def decode(self, input, final=False):
+            if self._decoder is None:
+                # Started on first use, so that one created and never used holds no thread.
+                self._decoder = tokenfeed.Decoder(**kwargs)
+                self._convert = simpletext.simple_text_converter(
+                                    _error_handler(encoding, self.errors))
+                if prefix:
+                    self._decoder.feed(prefix)
+            text = self._convert(self._decoder.feed(input))
+            if final:
+                text += self._convert(self._decoder.flush())
+                self._decoder = None
+            return text
+        def reset(self):
+            if self._decoder is not None:
+                self._decoder.close()
+                self._decoder = None
+    return codecs.CodecInfo(name=encoding, encode=encode, decode=decode,
+                            incrementalencoder=IncrementalEncoder,
+                            incrementaldecoder=IncrementalDecoder)
+
+def _search(name):
+    name = _normalise(name)
+    if name == "ecma35":
+        return _codec_info("")
+    elif name.startswith("ecma35_") and name[7:] in presets and name[7:]:
+        return _codec_info(name[7:])
+    return None
+
+_registered = False
+def register():
+    global _registered
+    if not _registered:
+        codecs.register(_search)
+        _registered = True
+
+register()
+
+
+
+
+
+
+
+
@@ -52,6 +52,9 @@ def decode_ecma35docs(stream, state):
     #
 #
 
+decode_ecma35docs.docsmodes = ("ecma-35",)
+
+
 
 
 
@@ -53,3 +53,6 @@ def decode_eight_ones_terminated(stream, state):
         else:
             yield token
 
+decode_eight_ones_terminated.docsmodes = ("eight-ones-terminated",)
+
+
@@ -106,6 +106,9 @@ def decode_elex(stream, state):
     #
 #
 
+decode_elex.docsmodes = ("elex",)
+
+
 
 
 
@@ -6,6 +6,7 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import collections
 from ecma35.data import controldata, graphdata
 
 def decode_esc_sequences(stream, state):
@@ -15,13 +16,23 @@ def decode_esc_sequences(stream, state):
     parbytes = []
     inesc = False
     reconsume = None
+    backlog = collections.deque()
+    held = False
     while 1:
+        if held != inesc:
+            # No batches from the tokeniser while partway through a sequence (see batching).
+            held = inesc
+            (state.batch_holds.add if held else state.batch_holds.discard)("esc")
         try:
-            token = (next(stream) if reconsume is None else reconsume)
+            token = (reconsume if reconsume is not None else
+                     backlog.popleft() if backlog else next(stream))
         except StopIteration:
             break
         reconsume = None
-        if not inesc:
+        if token[0] == "BATCH" and inesc:
+            # Taken one at a time when partway through a sequence.
+            backlog.extend(token[1])
+        elif not inesc:
             if (token[0] == "CTRL") and (token[1] in ("ESC",)):
                 active.append(token)
                 inesc = True
@@ -70,6 +81,9 @@ def decode_esc_sequences(stream, state):
             del idbytes[:]
             del parbytes[:]
 
+decode_esc_sequences.handles_batches = True
+
+
 
 
 
@@ -50,6 +50,9 @@ def decode_fixed_controls(stream, state):
             else:
                 yield ("ERROR", "UNSUPPESC", seq)
 
+decode_fixed_controls.handles_batches = True
+
+
 
 
 
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Fuses runs of consecutive filters into a single generated generator function, so that a token
+# passing through them doesn't pay for switching between the generators of each in turn. Turned
+# on by fused=True, but not when profiling (which needs the stages to be separate).
+#
+# Each filter's own code is used, with its local names prefixed so as not to clash with those of
+# the others, and its module's global names bound (to their values when the function is generated)
+# under similarly prefixed names. Each yield of a filter in the run is replaced by an inline copy of
+# the loop body of the next filter in the run, taking the yielded value as its token, so each
+# token is still taken all the way through the later filters before the earlier ones carry on,
+# exactly as it would be otherwise. Only the last filter in the run actually yields.
+#
+# A filter can only be fused if it takes the form of a generator function of (stream, state)
+# consisting of some setup followed by a loop over its tokens, with nothing after the loop, taking
+# either of the forms used throughout the decoder:
+#     for token in stream:
+#         ...
+# or:
+#     while 1:
+#         try:
+#             token = (next(stream) if reconsume is None else reconsume)
+#         except StopIteration:
+#             break
+#         reconsume = None
+#         ...
+# with every yield being a statement of its own, and stream mentioned nowhere else. Any other
+# filter simply stays as it is, between runs. Since a filter's body is copied once for every path
+# by which the filters before it in the run can yield, a run is ended before that would exceed
+# _maxcopies.
+#
+# The generated source is entered into linecache, so tracebacks from inside fused filters show it.
+
+import ast, builtins, copy, inspect, linecache, textwrap
+
+_maxcopies = 16
+_fused = {}
+
+class _Unfusable(Exception):
+    pass
+
+class _Filter(object):
+    # A filter taken apart for fusing.
+    def __init__(self, f, number):
+        self.function = f
+        self.prefix = "_{:d}_".format(number)
+        self.namespace = {}
+        if not inspect.isgeneratorfunction(f) or f.__closure__ or f.__defaults__ or (
+                f.__kwdefaults__):
+            raise _Unfusable(f)
+        try:
+            source = inspect.getsource(f)
+        except (OSError, TypeError):
+            raise _Unfusable(f)
+        definition = ast.parse(textwrap.dedent(source)).body[0]
+        if not isinstance(definition, ast.FunctionDef) or definition.decorator_list or [
+                i.arg for i in definition.args.args] != ["stream", "state"] or (
+                definition.args.vararg or definition.args.kwarg or definition.args.kwonlyargs):
+            raise _Unfusable(f)
+        *self.setup, loop = definition.body
+        for node in ast.walk(ast.Module(body=self.setup, type_ignores=[])):
+            if isinstance(node, (ast.Yield, ast.YieldFrom, ast.Return)) or _is_name(node,
+                                                                                     "stream"):
+                raise _Unfusable(f)
+        self._take_loop(loop)
+        self._check(definition)
+        self._rename(definition)
+        self.yields = sum(isinstance(node, (ast.Yield, ast.YieldFrom))
+                          for statement in self.body for node in ast.walk(statement))
+    #
+    def _take_loop(self, loop):
+        if isinstance(loop, ast.For) and _is_name(loop.iter, "stream") and isinstance(
+                loop.target, ast.Name) and not loop.orelse:
+            self.reconsume = None
+            self.token = loop.target.id
+            self.body = loop.body
+            return
+        # Otherwise, must be the reconsume form.
+        if not (isinstance(loop, ast.While) and isinstance(loop.test, ast.Constant) and (
+                loop.test.value in (1, True)) and not loop.orelse and len(loop.body) > 2):
+            raise _Unfusable(self.function)
+        fetch, clear, *body = loop.body
+        try:
+            assign, = fetch.body
+            handler, = fetch.handlers
+            token, = assign.targets
+            pull, reconsume = assign.value.body, assign.value.orelse
+            is_none, = assign.value.test.ops
+            good = (not fetch.orelse and not fetch.finalbody and
+                    _is_name(handler.type, "StopIteration") and handler.name is None and
+                    len(handler.body) == 1 and isinstance(handler.body[0], ast.Break) and
+                    isinstance(token, ast.Name) and isinstance(reconsume, ast.Name) and
+                    _is_name(assign.value.test.left, reconsume.id) and
+                    isinstance(is_none, ast.Is) and
+                    _is_none(assign.value.test.comparators[0]) and
+                    _is_name(pull.func, "next") and len(pull.args) == 1 and
+                    _is_name(pull.args[0], "stream") and
+                    _is_name(clear.targets[0], reconsume.id) and _is_none(clear.value))
+        except (AttributeError, ValueError, IndexError, TypeError):
+            good = False
+        if not good:
+            raise _Unfusable(self.function)
+        self.reconsume = reconsume.id
+        self.token = token.id
+        self.body = body
+    #
+    def _check(self, definition):
+        body = ast.Module(body=self.body, type_ignores=[])
+        for node in ast.walk(body):
+            if isinstance(node, (ast.Global, ast.Nonlocal, ast.FunctionDef, ast.AsyncFunctionDef,
+                                 ast.ClassDef, ast.Lambda)):
+                raise _Unfusable(self.function)
+            elif isinstance(node, ast.Name) and node.id == "stream":
+                raise _Unfusable(self.function)
+            elif isinstance(node, ast.Return) and node.value is not None:
+                raise _Unfusable(self.function)
+        # Yields must be statements of their own, and breaks can only leave loops within the body.
+        for statement in self.body:
+            for node in _walk_statements(statement):
+                if isinstance(node, ast.Break):
+                    raise _Unfusable(self.function)
+        for node in ast.walk(body):
+            if isinstance(node, ast.Expr) and isinstance(node.value, (ast.Yield, ast.YieldFrom)):
+                node.value.statement = True
+        for node in ast.walk(body):
+            if isinstance(node, (ast.Yield, ast.YieldFrom)) and not getattr(node, "statement",
+                                                                            False):
+                raise _Unfusable(self.function)
+    #
+    def _rename(self, definition):
+        local = {"stream", "state"}
+        for node in ast.walk(definition):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                local.add(node.id)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                local.add(node.name)
+        function_globals = self.function.__globals__
+        def rename(name):
+            if name == "state":
+                return name
+            elif name in local:
+                return self.prefix + name
+            elif name in function_globals:
+                self.namespace[self.prefix + name] = function_globals[name]
+                return self.prefix + name
+            return name # Builtins, or names which would be undefined anyway.
+        for node in ast.walk(definition):
+            if isinstance(node, ast.Name):
+                node.id = rename(node.id)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                node.name = rename(node.name)
+        self.token = rename(self.token)
+        if self.reconsume is not None:
+            self.reconsume = rename(self.reconsume)
+    #
+#
+
+def _is_name(node, name):
+    return isinstance(node, ast.Name) and node.id == name
+
+def _is_none(node):
+    return isinstance(node, ast.Constant) and node.value is None
+
+def _walk_statements(node):
+    # Walks the body of the filter's loop, but not the bodies of any loops nested within it.
+    yield node
+    if isinstance(node, (ast.For, ast.While)):
+        children = node.orelse
+    else:
+        children = [child for field in ("body", "orelse", "finalbody", "handlers")
+                    for child in getattr(node, field, ())]
+    for child in children:
+        if isinstance(child, ast.stmt) or isinstance(child, ast.ExceptHandler):
+            yield from _walk_statements(child)
+
+def _continues(statements):
+    return any(isinstance(node, ast.Continue) for statement in statements
+               for node in _walk_statements(statement))
+
+class _Generator(object):
+    def __init__(self, filters):
+        self.filters = filters
+        self.temporaries = 0
+    #
+    def inline(self, index, value):
+        # Statements for passing value to filters[index] and on, in place of a yield.
+        if index == len(self.filters):
+            return [ast.Expr(value=ast.Yield(value=value))]
+        stage = self.filters[index]
+        body = self.splice(index, copy.deepcopy(stage.body))
+        if stage.reconsume is not None:
+            return [_assign(stage.reconsume, value),
+                    ast.While(test=ast.Compare(left=_load(stage.reconsume), ops=[ast.IsNot()],
+                                               comparators=[ast.Constant(value=None)]),
+                              body=[_assign(stage.token, _load(stage.reconsume)),
+                                    _assign(stage.reconsume, ast.Constant(value=None))] + body,
+                              orelse=[])]
+        elif _continues(body):
+            return [ast.For(target=_store(stage.token), iter=ast.Tuple(elts=[value],
+                            ctx=ast.Load()), body=body, orelse=[])]
+        return [_assign(stage.token, value)] + body
+    #
+    def splice(self, index, statements):
+        # Replaces the yields among statements (of filters[index]) with the later filters.
+        result = []
+        for statement in statements:
+            if isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Yield):
+                value = statement.value.value or ast.Constant(value=None)
+                result.extend(self.inline(index + 1, value))
+                continue
+            elif isinstance(statement, ast.Expr) and isinstance(statement.value, ast.YieldFrom):
+                self.temporaries += 1
+                temporary = "_yielded{:d}".format(self.temporaries)
+                result.append(ast.For(target=_store(temporary), iter=statement.value.value,
+                                      body=self.inline(index + 1, _load(temporary)), orelse=[]))
+                continue
+            for field in ("body", "orelse", "finalbody"):
+                if isinstance(getattr(statement, field, None), list):
+                    setattr(statement, field, self.splice(index, getattr(statement, field)))
+            for handler in getattr(statement, "handlers", ()):
+                handler.body = self.splice(index, handler.body)
+            result.append(statement)
+        return result
+    #
+    def function(self, name):
+        head = self.filters[0]
+        body = []
+        # Each filter would otherwise be set up when first pulled from, i.e. the last first.
+        for stage in reversed(self.filters):
+            body.extend(copy.deepcopy(stage.setup))
+        loop = self.splice(0, copy.deepcopy(head.body))
+        if head.reconsume is None:
+            body.append(ast.For(target=_store(head.token), iter=_load("stream"), body=loop,
+                                orelse=[]))
+        else:
+            fetch = ast.Try(body=[_assign(head.token, ast.IfExp(
+                                test=ast.Compare(left=_load(head.reconsume), ops=[ast.Is()],
+                                                 comparators=[ast.Constant(value=None)]),
+                                body=ast.Call(func=_load("next"), args=[_load("stream")],
+                                              keywords=[]),
+                                orelse=_load(head.reconsume)))],
+                            handlers=[ast.ExceptHandler(type=_load("StopIteration"), name=None,
+                                                        body=[ast.Break()])],
+                            orelse=[], finalbody=[])
+            body.append(ast.While(test=ast.Constant(value=1), body=[
+                            fetch, _assign(head.reconsume, ast.Constant(value=None))] + loop,
+                                  orelse=[]))
+        definition = ast.FunctionDef(name=name, args=ast.arguments(
+                         posonlyargs=[], args=[ast.arg(arg="stream"), ast.arg(arg="state")],
+                         kwonlyargs=[], kw_defaults=[], defaults=[]),
+                         body=body, decorator_list=[], returns=None)
+        return ast.Module(body=[definition], type_ignores=[])
+    #
+#
+
+def _load(name):
+    return ast.Name(id=name, ctx=ast.Load())
+
+def _store(name):
+    return ast.Name(id=name, ctx=ast.Store())
+
+def _assign(name, value):
+    return ast.Assign(targets=[_store(name)], value=value)
+
+def fuse_run(functions):
+    # A single generator function equivalent to chaining the given (fusable) filters.
+    functions = tuple(functions)
+    try:
+        return _fused[functions]
+    except KeyError:
+        pass
+    filters = [_Filter(f, number) for number, f in enumerate(functions)]
+    name = "fused_" + "_".join(f.__name__ for f in functions)
+    module = ast.fix_missing_locations(_Generator(filters).function(name))
+    source = ast.unparse(module) + "\n"
+    filename = "<{}>".format(name)
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = {"__name__": __name__, "__builtins__": builtins}
+    for stage in filters:
+        namespace.update(stage.namespace)
+    exec(compile(source, filename, "exec"), namespace)
+    fused = namespace[name]
+    fused.__module__ = __name__
+    fused.fused = functions
+    fused.source = source
+    if all(getattr(f, "handles_batches", False) for f in functions):
+        fused.handles_batches = True
+    _fused[functions] = fused
+    return fused
+
+def fuse_stages(stages):
+    # Replaces runs of consecutive fusable stages in the list with their fused counterparts.
+    result = []
+    run = []
+    copies = 1
+    def end_run():
+        if len(run) > 1:
+            result.append(fuse_run(run))
+        else:
+            result.extend(run)
+        del run[:]
+    for f in stages:
+        try:
+            yields = _yields(f)
+        except _Unfusable:
+            end_run()
+            result.append(f)
+            copies = 1
+            continue
+        if run and copies > _maxcopies:
+            end_run()
+            copies = 1
+        run.append(f)
+        copies *= max(yields, 1)
+    end_run()
+    return result
+
+_yield_counts = {}
+def _yields(f):
+    # The number of yields in a filter's loop, or raises _Unfusable.
+    try:
+        yields = _yield_counts[f]
+    except KeyError:
+        try:
+            yields = _yield_counts[f] = _Filter(f, 0).yields
+        except _Unfusable:
+            yields = _yield_counts[f] = None
+    except TypeError: # Unhashable.
+        raise _Unfusable(f)
+    if yields is None:
+        raise _Unfusable(f)
+    return yields
+
+
+
+
+
+
+
+
+
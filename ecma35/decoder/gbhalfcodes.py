@@ -62,6 +62,12 @@ def decode_gbhalfcodes(stream, state):
     #
 #
 
+# Batches hold no half-codes, so a batch truncates a pending one just as its first token would.
+decode_gbhalfcodes.handles_batches = True
+# Half-codes only come from decoder.gbkfilter.
+decode_gbhalfcodes.only_in_docsmodes = ("gbk",)
+
+
 
 
 
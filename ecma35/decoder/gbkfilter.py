@@ -8,16 +8,60 @@
 
 # DOCS filter for GBK, also generating GBHALFCODE tokens for GB18030.
 
+import re, collections
 from ecma35.data import graphdata
+from ecma35.decoder import batching
 from ecma35.data.multibyte import guobiao
 
+def _decode_pair(lead, trail, state, workingsets):
+    # The tokens for a two-byte code, or None if the trail byte can't follow the lead byte.
+    if (0xA1 <= trail <= 0xFE) and (0xA1 <= lead <= 0xFE):
+        # Ordinary EUC code ("Level 1" / "Level 2"): treat normally.
+        return ((workingsets[state.grset], lead - 0xA0, "GR"),
+                (workingsets[state.grset], trail - 0xA0, "GR"))
+    elif (0x81 <= lead <= 0xA0) and ((0x40 <= trail <= 0x7E) or (0x80 <= trail <= 0xFE)):
+        # "Level 3"
+        row_number = lead - 0x81
+        index = (row_number * 190) + (trail - 0x40)
+        if trail > 0x7F:
+            index -= 1
+        return (("UCS", guobiao.non_euccn_uro101[index], "GBK", "GBK/3"),)
+    elif (0xAA <= lead <= 0xFE) and ((0x40 <= trail <= 0x7E) or (0x80 <= trail <= 0xA0)):
+        # "Level 4"
+        row_number = lead - 0xAA
+        index = (0x20 * 190) + (row_number * 96) + (trail - 0x40)
+        if trail > 0x7F:
+            index -= 1
+        #
+        if index < len(guobiao.non_euccn_uro101):
+            return (("UCS", guobiao.non_euccn_uro101[index], "GBK", "GBK/4"),)
+        else:
+            exception_index = (96 * 93) + 91 + (index - len(guobiao.non_euccn_uro101))
+            return (("G3", exception_index // 96, "GBKExtras"),
+                    ("G3", exception_index % 96, "GBKExtras"))
+    elif (0xA1 <= lead <= 0xA9) and ((0x40 <= trail <= 0x7E) or (0x80 <= trail <= 0xA0)):
+        # "Level 5"
+        row_number = lead - 0xA0
+        cell_number = trail - 0x40
+        if trail > 0x7F:
+            cell_number -= 1
+        #
+        return (("G3", row_number, "GBKExtras"), ("G3", cell_number, "GBKExtras"))
+    elif (0x81 <= lead <= 0xFE) and (0x30 <= trail <= 0x39):
+        # GB18030 half-code
+        pointer = ((lead - 0x81) * 10) + (trail - 0x30)
+        return (("GBHALFCODE", pointer),)
+    return None
+
 def decode_gbk(stream, state):
     workingsets = graphdata.workingsets
     gbk_lead = None
     reconsume = None
+    backlog = collections.deque()
     while 1:
         try:
-            token = (next(stream) if reconsume is None else reconsume)
+            token = (reconsume if reconsume is not None else
+                     backlog.popleft() if backlog else next(stream))
         except StopIteration:
             break
         reconsume = None
@@ -58,62 +102,46 @@ def decode_gbk(stream, state):
                     yield ("G2", 0x46, "GBK1BYTE")
                 else:
                     gbk_lead = token
-            elif (0xA1 <= token[1] <= 0xFE) and (0xA1 <= gbk_lead[1] <= 0xFE):
-                # Ordinary EUC code ("Level 1" / "Level 2"): treat normally.
-                yield (workingsets[state.grset], gbk_lead[1] - 0xA0, "GR")
-                yield (workingsets[state.grset], token[1] - 0xA0, "GR")
-                gbk_lead = None
-            elif (0x81 <= gbk_lead[1] <= 0xA0) and (
-                          (0x40 <= token[1] <= 0x7E) or (0x80 <= token[1] <= 0xFE)):
-                # "Level 3"
-                row_number = gbk_lead[1] - 0x81
-                index = (row_number * 190) + (token[1] - 0x40)
-                if token[1] > 0x7F:
-                    index -= 1
-                yield ("UCS", guobiao.non_euccn_uro101[index], "GBK", "GBK/3")
-                gbk_lead = None
-            elif (0xAA <= gbk_lead[1] <= 0xFE) and (
-                          (0x40 <= token[1] <= 0x7E) or (0x80 <= token[1] <= 0xA0)):
-                # "Level 4"
-                row_number = gbk_lead[1] - 0xAA
-                index = (0x20 * 190) + (row_number * 96) + (token[1] - 0x40)
-                if token[1] > 0x7F:
-                    index -= 1
-                #
-                if index < len(guobiao.non_euccn_uro101):
-                    yield ("UCS", guobiao.non_euccn_uro101[index], "GBK", "GBK/4")
-                    gbk_lead = None
-                else:
-                    exception_index = (96 * 93) + 91 + (index - len(guobiao.non_euccn_uro101))
-                    yield ("G3", exception_index // 96, "GBKExtras")
-                    yield ("G3", exception_index % 96, "GBKExtras")
-                    gbk_lead = None
-            elif (0xA1 <= gbk_lead[1] <= 0xA9) and (
-                          (0x40 <= token[1] <= 0x7E) or (0x80 <= token[1] <= 0xA0)):
-                # "Level 5"
-                row_number = gbk_lead[1] - 0xA0
-                cell_number = token[1] - 0x40
-                if token[1] > 0x7F:
-                    cell_number -= 1
-                #
-                yield ("G3", row_number, "GBKExtras")
-                yield ("G3", cell_number, "GBKExtras")
-                gbk_lead = None
-            elif (0x81 <= gbk_lead[1] <= 0xFE) and (0x30 <= token[1] <= 0x39):
-                # GB18030 half-code
-                pointer = ((gbk_lead[1] - 0x81) * 10) + (token[1] - 0x30)
-                yield ("GBHALFCODE", pointer)
-                gbk_lead = None
             else:
-                yield ("ERROR", "GBKTRUNCATE", gbk_lead[1])
+                pair = _decode_pair(gbk_lead[1], token[1], state, workingsets)
+                if pair is None:
+                    yield ("ERROR", "GBKTRUNCATE", gbk_lead[1])
+                    reconsume = token # Note: token being reconsumed is a non-letter single byte code.
+                else:
+                    yield from pair
                 gbk_lead = None
-                reconsume = token # Note: token being reconsumed is a non-letter single byte code.
+        elif state.docsmode == "gbk" and token[0] == "WORDS":
+            # Run of single bytes and two-byte codes, matched by word_runs (see batching).
+            if gbk_lead is not None:
+                # Partway through a two-byte code, so take the words one at a time.
+                backlog.extend(batching.contents(token, state))
+                continue
+            data = token[1]
+            batch = []
+            single = workingsets[state.glset]
+            space = ("CTRL", "SP", "ECMA-35", 0, "GL", single
+                    ) if not state.is_96[state.glset] else (single, 0, "GL")
+            index = 0
+            while index < len(data):
+                if data[index] < 0x80:
+                    batch.append(space if data[index] == 0x20 else (single, data[index] - 0x20, "GL"))
+                    index += 1
+                else:
+                    batch.extend(_decode_pair(data[index], data[index + 1], state, workingsets))
+                    index += 2
+            yield ("BATCH", tuple(batch))
         else:
             yield token
         #
     #
 #
 
+decode_gbk.docsmodes = ("gbk",)
+decode_gbk.handles_batches = True
+# Leaves out the DEL, the single-byte 0x80 and 0xFF and the GB18030 four-byte codes.
+decode_gbk.word_runs = re.compile(rb"(?:[\x20-\x7E]|[\x81-\xFE][\x40-\x7E\x80-\xFE])+")
+
+
 
 
 
@@ -75,6 +75,11 @@ def proc_gcc_sequences(stream, state):
         except StopIteration:
             break
         reconsume = None
+        if token[0] == "CHARS" and mode != "normal":
+            # Taken one at a time while a sequence is underway (a CHAR never being reconsumed).
+            if len(token[1]) > 1:
+                reconsume = ("CHARS", token[1][1:])
+            token = token[1][0]
         if mode == "normal":
             if token[:3] in (("CSISEQ", "GCC", (0x30,)), ("CSISEQ", "GCC", ())):
                 mode = "firstbyte"
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Fast path for runs of plain characters from a single-byte 94-set invoked over GL (ASCII, for
+# instance), which make up the bulk of most text in ECMA-35 mode.
+#
+# gather_gl_runs, coming straight after invocations, collects such a run into a single GLRUN token,
+# giving the set name as resolved at that point. The run ends at the first token of anything else
+# (a control, an escape or control sequence, a GR byte, a single shift and so forth), everything of
+# which has been dealt with by the earlier stages by the time it gets here. graphsets then looks up
+# the run in one go, giving a single CHARS token holding the CHAR tokens, which the later stages pass
+# along whole unless they have something pending, in which case they take it apart. Finally,
+# expand_char_runs gives the CHAR tokens individually again, unless the lastfilter handles CHARS
+# tokens itself (which it indicates by having a true accepts_char_runs attribute).
+#
+# Only characters which none of the later stages treat specially go in a run: those which are
+# unmapped or map to a sequence, prefixed diacritics, format effectors, Hangul compatibility jamo
+# and the composition hints from Apple's mappings are left to the usual path.
+#
+# Gathering a run means reading ahead to the token after it, which would hold up the run in push
+# mode until more data arrives, so the Decoder turns this off (gl_runs=False).
+
+from ecma35.data import graphdata, controldata
+from ecma35.data.multibyte import korea
+
+_setnumbers = {"G0": 0, "G1": 1, "G2": 2, "G3": 3, "G4": 4}
+_maxrun = 0x1000
+_char_tables = {}
+
+def _is_plain(ucs):
+    return (isinstance(ucs, int) and ucs > 0 and ucs not in controldata.formats and
+            not (0xF860 <= ucs <= 0xF86B) and chr(ucs) not in korea.compatjamo)
+
+def char_table(tgset, setname):
+    # The CHAR token for each byte of a single-byte 94-set, or None where it can't go in a run.
+    try:
+        return _char_tables[tgset, setname]
+    except KeyError:
+        pass
+    table = [None] * 96
+    if tgset != "Unknown" and tuple(graphdata.gsets[tgset][:2]) == (94, 1):
+        array = graphdata.gsets[tgset][2]
+        for byt in range(1, 95):
+            ucs = array[byt - 1] if byt - 1 < len(array) else None
+            if isinstance(ucs, tuple) and len(ucs) == 1:
+                ucs = ucs[0]
+            if _is_plain(ucs):
+                table[byt] = ("CHAR", ucs, tgset, (byt,), setname, "GL")
+    table = _char_tables[tgset, setname] = tuple(table)
+    return table
+
+def gather_gl_runs(stream, state):
+    reconsume = None
+    while 1:
+        try:
+            token = (next(stream) if reconsume is None else reconsume)
+        except StopIteration:
+            break
+        reconsume = None
+        if token[0] in _setnumbers and token[2] == "GL" and hasattr(state, "cur_gsets"):
+            setname = token[0]
+            tgset = state.cur_gsets[_setnumbers[setname]]
+            table = char_table(tgset, setname)
+            if table[token[1]] is not None:
+                run = [token[1]]
+                for token in stream:
+                    if token[0] == setname and token[2] == "GL" and (
+                            table[token[1]] is not None) and len(run) < _maxrun:
+                        run.append(token[1])
+                    else:
+                        reconsume = token
+                        break
+                yield ("GLRUN", setname, tgset, tuple(run))
+                continue
+        yield token
+
+def expand_char_runs(stream, state):
+    for token in stream:
+        if token[0] == "CHARS":
+            yield from token[1]
+        else:
+            yield token
+
+
+
+
+
+
@@ -8,6 +8,7 @@
 
 import sys
 from ecma35.data import graphdata
+from ecma35.decoder import glruns
 
 def _tonumber(s):
     if (len(s) != 2) or (s[0] != "G") or (s[1] not in "01234"):
@@ -80,6 +81,18 @@ def decode_graphical_sets(stream, state):
         except StopIteration:
             break
         reconsume = None
+        if token[0] == "GLRUN":
+            # A run's set is a single-byte set, so anything pending can't be continued by it.
+            # The earlier stages, having read on past the run, may have moved on to another set, so
+            #   the run's own is used.
+            if pending:
+                yield ("ERROR", "TRUNCMB", token[2], tuple(pending), pset, invrange)
+                del pending[:]
+                pset = -1
+                invrange = None
+            table = glruns.char_table(token[2], token[1])
+            yield ("CHARS", tuple(map(table.__getitem__, token[3])))
+            continue
         tno = _tonumber(token[0])
         # The cur_gsets state prop might not yet be defined if e.g. DOCS % @ hasn't happened yet.
         tgset = state.cur_gsets[tno] if hasattr(state, "cur_gsets") else "Unknown"
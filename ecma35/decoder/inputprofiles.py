@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Named input profiles, for input known to be in a particular format, given as (e.g.)
+# input_profile="euc-kr" in place of a collection of docsmodes. Each names the DOCS reachable from
+# ECMA-35 (which always is), the optional post-processing stages which are kept (the rest being
+# left out of the pipeline, with whatever they would have acted upon passed through as it is), and
+# the escape sequences which the input is read as following (taking effect as with --docs and
+# --designate, see __main__). The "full" profile is the same as giving no profile at all.
+#
+# With any profile besides "full" (including a collection of docsmodes), switching to a DOCS
+# outside of it gives an UNSUPPORTEDDOCS error, and the data following is passed on as for an
+# unrecognised DOCS (i.e. as CODEWORD tokens, up to any standard return), rather than being
+# decoded by a filter which isn't in the pipeline. A code page switch (see chcpsequences) to such
+# a DOCS gives the error, but is otherwise ignored.
+#
+# The prefix diacritics stage is never optional, since a designation of a set using them could
+# turn up in any profile, and its tokens can't be passed on as they are.
+
+optional_stages = ("gccsequences", "hangulfillers", "bssequences")
+
+profiles = {
+    "iso-2022-jp": {"docsmodes": (), "stages": (), "prefix": b""},
+    # KS X 1001 in G1, and so in GR.
+    "euc-kr": {"docsmodes": (), "stages": ("hangulfillers",), "prefix": b"\x1B$)C"},
+    "gb18030": {"docsmodes": ("gbk",), "stages": (), "prefix": b"\x1B%2"},
+    # Overstrikes with BS, and GCC, being ECMA-48 mechanisms.
+    "utf-8-with-ecma48": {"docsmodes": ("utf-8",), "stages": ("gccsequences", "bssequences"),
+                          "prefix": b"\x1B%G"},
+    "full": {"docsmodes": None, "stages": optional_stages, "prefix": b""},
+}
+
+def resolve(input_profile):
+    # The docsmodes (including ECMA-35), or None for all; the stages left out (by module name);
+    # and the prefix; for an input_profile option.
+    if input_profile is None:
+        return None, frozenset(), b""
+    elif isinstance(input_profile, str):
+        if input_profile not in profiles:
+            raise ValueError("unknown input profile: {!r} (known: {})".format(
+                             input_profile, ", ".join(sorted(profiles))))
+        profile = profiles[input_profile]
+        omitted = frozenset(optional_stages) - frozenset(profile["stages"])
+        if profile["docsmodes"] is None:
+            return None, omitted, profile["prefix"]
+        return frozenset(profile["docsmodes"]) | {"ecma-35"}, omitted, profile["prefix"]
+    return frozenset(input_profile) | {"ecma-35"}, frozenset(), b""
+
+def refuse_unsupported_docs(stream, state):
+    docsmodes = resolve(state.input_profile)[0]
+    for token in stream:
+        if token[0] == "RDOCS" and token[1] not in docsmodes:
+            yield ("ERROR", "UNSUPPORTEDDOCS", token)
+            if token[2] is not None: # i.e. not from a code page switch
+                yield ("DOCS", token[2], token[3])
+        else:
+            yield token
+
+refuse_unsupported_docs.handles_batches = True
+
+
+
+
+
+
+
+
+
@@ -86,6 +86,9 @@ def decode_modeuc(stream, state):
     #
 #
 
+decode_modeuc.docsmodes = ("modified-euc",)
+
+
 
 
 
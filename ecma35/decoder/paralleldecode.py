@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Decodes a large file across several processes, by splitting it at returns to ECMA-35 (ESC % @),
+# which reset the designations and invocations to their initial state, and decoding each chunk
+# from a fresh start in a separate process.
+#
+# Whether a given ESC % @ really is a safe split point cannot be known without decoding up to it
+# (it might be a DOCS without standard return, or partway through a control string, for example).
+# So each split is checked: the chunk before it is decoded for a window past the split, and the
+# tokens and state at the end of that window must match those from decoding just the window from
+# a fresh start. Where they don't, the chunks either side are decoded as one instead. The DOCS stack
+# (as popped by CMD) isn't reset by ESC % @, so a chunk whose CMDs pop back past its start is
+# decoded again from the start of the file.
+
+import os, mmap, concurrent.futures
+from ecma35.decoder import tokenfeed, policies
+
+_splitsequence = b"\x1B%@"
+
+def _passthrough(stream, state):
+    return stream
+
+def _state_snapshot(state):
+    snapshot = dict(vars(state))
+    del snapshot["feedback"]
+    # The DOCS stack is handled separately (see _pops_below_start), while the byte order is only
+    # consulted for multi-byte words, and set afresh whenever those are switched to.
+    del snapshot["docs_sequence_stack"]
+    if snapshot["bytewidth"] == 1:
+        del snapshot["endian"]
+    return snapshot
+
+def _pops_below_start(tokens):
+    # A CMD (which pops the DOCS stack) reaching back past the ESC % @ at the start of a chunk
+    # would find different entries to those it would have found when decoding the whole file.
+    # After the starting RDOCS from the fresh start, the first RDOCS is that of the ESC % @.
+    depth = 0
+    for token in tokens[1:]:
+        if token[0] == "RDOCS":
+            if token[2] is None: # i.e. from a CMD
+                depth -= 1
+                if depth < 1:
+                    return True
+            else:
+                depth += 1
+    return False
+
+def _decode_range(filename, start, stop, kwargs, tolerant):
+    # A range stopping short of the end of the file may well stop partway through a sequence, or a
+    # word of UTF-16 or UTF-32, which can make decoding it fail outright. If tolerant (i.e. for such
+    # a range), that is taken to mean (None, None), rather than the exception being raised, so the
+    # split can be rejected instead.
+    with open(filename, "rb") as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    state = tokenfeed._make_state(kwargs)
+    try:
+        tokens = list(tokenfeed._build_pipeline(data, state, _passthrough))
+    except Exception:
+        if not tolerant:
+            raise
+        return None, None
+    return tokens, _state_snapshot(state)
+
+def find_split_points(filename, chunksize):
+    # Offsets of the first ESC % @ at or after each multiple of chunksize (and zero).
+    splits = [0]
+    if not os.path.getsize(filename):
+        return splits
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        while 1:
+            offset = data.find(_splitsequence, max(splits[-1] + 1, len(splits) * chunksize))
+            if offset < 0:
+                break
+            splits.append(offset)
+    return splits
+
+def process_file_parallel(filename, *, executor=None, workers=None, chunksize=0x400000,
+                          window=0x1000, **kwargs):
+    # Yields the same tokens as process_stream with a lastfilter passing them through unchanged.
+    # The chunks are decoded with the bookkeeping tokens and errors kept, since the former are
+    # needed for checking the splits, and an error in a chunk decoded in vain mustn't be raised; the
+    # policy and metadata options (see policies) are applied to the tokens as they're given.
+    size = os.path.getsize(filename)
+    splits = find_split_points(filename, chunksize)
+    bounds = splits + [size]
+    filters = policies.policy_filters(kwargs.pop("policy", "replace"))
+    if not kwargs.pop("metadata", True):
+        filters.insert(0, policies.drop_metadata)
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            yield from _apply(filters, _process_chunks(filename, executor, bounds, size, window,
+                                                       kwargs))
+    else:
+        yield from _apply(filters, _process_chunks(filename, executor, bounds, size, window, kwargs))
+
+def _apply(filters, stream):
+    for f in filters:
+        stream = f(stream, None)
+    return stream
+
+def _process_chunks(filename, executor, bounds, size, window, kwargs):
+    def submit(first, last):
+        # Decodes chunks first to last inclusive, plus the window past the end.
+        stop = size if last == len(bounds) - 2 else min(bounds[last + 1] + window, size)
+        return executor.submit(_decode_range, filename, bounds[first], stop, kwargs, stop < size)
+    chunkcount = len(bounds) - 1
+    bodies = [submit(i, i) for i in range(chunkcount)]
+    heads = [None] + [executor.submit(_decode_range, filename, bounds[i],
+                                      min(bounds[i] + window, size), kwargs,
+                                      bounds[i] + window < size)
+                      for i in range(1, chunkcount)]
+    yielded = 0
+    def take(first, last, future):
+        tokens, state = future.result()
+        if first and tokens is not None and _pops_below_start(tokens):
+            # Decode from the very start of the file up to here. Costly, but fortunately rare.
+            first = 0
+            tokens, state = submit(0, last).result()
+        # From the start of the file, skip what has already been given (which is all of it that
+        # the decodes from offset zero have in common); otherwise, the RDOCS from the fresh start.
+        return first, tokens, state, (1 if first else yielded)
+    first, tokens, state, skip = take(0, 0, bodies[0])
+    last = 0
+    span = 1
+    while last + 1 < chunkcount:
+        head, headstate = heads[last + 1].result()
+        head = head[1:] if head is not None else None
+        if tokens is not None and head is not None and state == headstate and (
+                tokens[-len(head):] == head):
+            for token in tokens[skip:len(tokens) - len(head)]:
+                yield token
+                yielded += 1
+            last += 1
+            first, tokens, state, skip = take(last, last, bodies[last])
+            span = 1
+        else:
+            # Not a safe split after all, or not one which could be checked. Decode straight
+            # through it, taking more chunks at once each successive time, so runs of false splits
+            # (e.g. in a DOCS without standard return) don't take quadratic time.
+            for body in bodies[last + 1:last + 1 + span]:
+                body.cancel()
+            last = min(last + span, chunkcount - 1)
+            first, tokens, state, skip = take(first, last, submit(first, last))
+            span *= 2
+        #
+    yield from tokens[skip:]
+
+
+
+
+
+
+
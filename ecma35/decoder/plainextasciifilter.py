@@ -156,6 +156,9 @@ def decode_plainextascii(stream, state):
     #
 #
 
+decode_plainextascii.docsmodes = ("plainextascii",)
+
+
 
 
 
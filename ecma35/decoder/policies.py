@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Error-handling policies and suppression of bookkeeping tokens, for process_stream.
+#
+# The policy option says what becomes of ERROR tokens, just before the lastfilter:
+#   "replace" (the default): passed on, for the lastfilter to show (simple_print shows U+FFFD).
+#   "ignore": dropped.
+#   "strict": ValueError raised at the first one. Since the filters only pull more input once the
+#       later ones are done with the previous token, nothing more is read (besides the rest of the
+#       block already read by the tokeniser) and no later tokens are decoded.
+# Isolated surrogates from wobbly UTF aren't ERROR tokens (but CHAR tokens), so are left to the
+# lastfilter (simpletext treats them as errors, for instance).
+#
+# With metadata=False, tokens which only record how the text was encoded (DOCS and designations,
+# for instance) are dropped right after the last stage acting upon them, so the later stages and
+# the lastfilter never see them: the DOCS ones after the DOCS filters, and the designation ones after
+# graphsets. Note that other stages holding something pending (a prefixed diacritic, for instance)
+# may then give their tokens in a different order, since nothing comes between.
+
+_docs_metadata = frozenset(("DOCS", "RDOCS", "CHCP", "BOM", "SCSUSHIFT", "SCSUDESIG", "C0GRAPH"))
+_designation_metadata = frozenset(("DESIG", "RDESIG", "SINGLEOVER"))
+metadata = _docs_metadata | _designation_metadata
+policies = ("replace", "ignore", "strict")
+
+def drop_docs_metadata(stream, state):
+    for token in stream:
+        if token[0] not in _docs_metadata:
+            yield token
+
+def drop_designation_metadata(stream, state):
+    for token in stream:
+        if token[0] not in _designation_metadata:
+            yield token
+
+def drop_metadata(stream, state):
+    # Both of the above at once, for a stream of tokens already decoded.
+    for token in stream:
+        if token[0] not in metadata:
+            yield token
+
+def ignore_errors(stream, state):
+    for token in stream:
+        if token[0] != "ERROR":
+            yield token
+
+def raise_errors(stream, state):
+    for token in stream:
+        if token[0] == "ERROR":
+            raise ValueError("undecodable input: {!r}".format(token))
+        yield token
+
+def policy_filters(policy):
+    # The filters for a given policy, to go just before the lastfilter.
+    if policy not in policies:
+        raise ValueError("unknown error policy: {!r}".format(policy))
+    return {"replace": [], "ignore": [ignore_errors], "strict": [raise_errors]}[policy]
+
+# Batches (see batching) hold nothing which would be dropped.
+drop_docs_metadata.handles_batches = True
+
+
+
+
+
+
+
+
+
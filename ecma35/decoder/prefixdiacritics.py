@@ -13,6 +13,9 @@ def handle_prefix_diacritics(stream, state):
     #   diactritics, they follow them in Unicode (see TUS 13.0 § 7.9 p. 334).
     # Their corresponding double diacritics are supposed to be infix, faulty implementations
     #   in deployment notwithstanding.
+    # At most diacritic_cap tokens (diacritics and whatever else comes between them and the base
+    #   character) are held back; any more, and the diacritics are given up on, in an ERROR.
+    cap = state.diacritic_cap
     tseq = []
     cseq = []
     bank = []
@@ -26,14 +29,24 @@ def handle_prefix_diacritics(stream, state):
                 yield from iter(bank)
                 yield token
                 return
-            elif token[0] != "CHAR":
+            elif token[0] not in ("CHAR", "CHARS"):
                 bank.append(token)
             else:
+                rest = ()
+                if token[0] == "CHARS":
+                    # Only the first completes the sequence; the rest go through as they are.
+                    token, rest = token[1][0], token[1][1:]
                 tseq.append(token)
                 cseq.insert(0, token[1])
                 yield ("COMPCHAR", tuple(cseq), tuple(tseq))
                 yield from iter(bank)
                 del tseq[:] ; del cseq[:] ; del bank[:]
+                if rest:
+                    yield ("CHARS", rest)
         else:
             yield token
+        if tseq and cap is not None and len(tseq) + len(bank) > cap:
+            yield ("ERROR", "DIACRITICCAP", tuple(tseq))
+            yield from iter(bank)
+            del tseq[:] ; del cseq[:] ; del bank[:]
 
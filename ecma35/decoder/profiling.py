@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Per-stage profiling of the decoder pipeline, enabled by passing profile= to process_stream: either
+# a PipelineProfile to be filled in, or True to have the report printed to stderr at the end of the
+# stream. Without it, the pipeline is built exactly as usual, so has no overhead at all.
+#
+# Each stage's output is wrapped, counting the tokens it gives and the wall time spent inside its
+# __next__. Since the stages pull from one another, that time includes the upstream stages; the time
+# of each stage proper is what remains after taking away that of the stage before it. The time spent
+# in the wrapper around the stage before it falls within it too, so the cost of a wrapper per token
+# is measured once (on a stage doing nothing) and taken away for each token coming in; without
+# this, the wrappers would dwarf the cheaper stages. The DOCS router counts as a single stage, the
+# DOCS filters within it not being chained linearly.
+#
+# Internal buffering is gauged from the local variables of each stage's generator (between tokens)
+# which are lists, deques or bytearrays: the greatest length each is seen at is recorded, for those
+# seen to change length in place (so lookup tables, and the router's list of filters, are left out).
+# Walking the locals costs far more than most stages take per token, so is only done every
+# _sample_interval tokens (and for the first), outside of the timed part; the lengths are thus
+# those sampled, and a buffer briefly filled between samples may be missed.
+
+import sys, time, collections
+
+_buffertypes = (list, collections.deque, bytearray)
+_sample_interval = 0x100
+_overhead = None # Seconds per token, see _calibrate
+
+class _StageStats(object):
+    __slots__ = ("name", "tokens_out", "inclusive", "buffer_last", "buffer_max", "buffers")
+    def __init__(self, name):
+        self.name = name
+        self.tokens_out = 0
+        self.inclusive = 0.0
+        self.buffer_last = {}
+        self.buffer_max = {}
+        self.buffers = set()
+
+class PipelineProfile(object):
+    def __init__(self, *, report=None):
+        # The table is written to report (a text stream) at the end of the stream, if given.
+        self.stages = []
+        self.finished = False
+        self.report = report
+        self.overhead = _calibrate()
+    #
+    def wrap(self, f, stream):
+        name = "{}.{}".format(f.__module__.rsplit(".", 1)[-1], f.__name__)
+        stats = _StageStats(name)
+        self.stages.append(stats)
+        return _profiled(iter(stream), stats, self)
+    #
+    def finish(self):
+        self.finished = True
+        if self.report is not None:
+            print(self.table(), file=self.report)
+    #
+    def as_dict(self):
+        stages = []
+        previous = None
+        for stats in self.stages:
+            buffers = {name: stats.buffer_max[name] for name in sorted(stats.buffers)}
+            own = stats.inclusive
+            if previous:
+                own -= previous.inclusive + self.overhead * previous.tokens_out
+            stages.append({
+                "name": stats.name,
+                "tokens_in": previous.tokens_out if previous else None,
+                "tokens_out": stats.tokens_out,
+                "time": max(own, 0.0),
+                "inclusive_time": stats.inclusive,
+                "max_buffer": max(buffers.values(), default=0),
+                "buffers": buffers})
+            previous = stats
+        return {"finished": self.finished, "stages": stages,
+                "total_time": sum(stage["time"] for stage in stages),
+                "overhead_per_token": self.overhead}
+    #
+    def table(self):
+        report = self.as_dict()
+        total = report["total_time"] or 1.0
+        lines = ["{:<44} {:>10} {:>10} {:>9} {:>6} {:>7}".format("Stage", "In", "Out",
+                 "Time (s)", "%", "Buffer")]
+        for stage in report["stages"]:
+            lines.append("{:<44} {:>10} {:>10} {:>9.3f} {:>6.1f} {:>7}".format(stage["name"],
+                         "-" if stage["tokens_in"] is None else stage["tokens_in"],
+                         stage["tokens_out"], stage["time"], stage["time"] * 100 / total,
+                         stage["max_buffer"]))
+        lines.append("{:<44} {:>10} {:>10} {:>9.3f}".format("Total", "", "",
+                                                            report["total_time"]))
+        return "\n".join(lines)
+    #
+    def __str__(self):
+        return self.table()
+    #
+#
+
+def _profiled(stream, stats, profile):
+    clock = time.perf_counter
+    take = stream.__next__
+    frame = getattr(stream, "gi_frame", None)
+    if frame is not None and frame.f_code is _profiled.__code__:
+        # A lastfilter handing back its input unchanged, so nothing of its own to inspect.
+        frame = None
+    buffer_last, buffer_max, buffers = stats.buffer_last, stats.buffer_max, stats.buffers
+    countdown = 1
+    while 1:
+        start = clock()
+        try:
+            token = take()
+        except StopIteration:
+            stats.inclusive += clock() - start
+            break
+        stats.inclusive += clock() - start
+        stats.tokens_out += 1
+        countdown -= 1
+        if not countdown and frame is not None:
+            countdown = _sample_interval
+            for name, value in frame.f_locals.items():
+                if isinstance(value, _buffertypes):
+                    length = len(value)
+                    if length > buffer_max.get(name, -1):
+                        buffer_max[name] = length
+                    last, lastlength = buffer_last.get(name, (None, None))
+                    if value is last and length != lastlength:
+                        buffers.add(name)
+                    buffer_last[name] = (value, length)
+        yield token
+    if profile is not None and stats is profile.stages[-1]:
+        profile.finish()
+
+def _calibrate(count=0x4000):
+    # The time per token which a wrapper adds to the stage downstream of it, from wrapping a stage
+    # which does nothing (the least of several runs, worked out once).
+    global _overhead
+    if _overhead is None:
+        clock = time.perf_counter
+        tokens = [("WORD", 0)] * count
+        best = None
+        for i in range(5):
+            start = clock()
+            collections.deque((token for token in tokens), maxlen=0)
+            bare = clock() - start
+            stats = _StageStats("calibration")
+            start = clock()
+            collections.deque(_profiled((token for token in tokens), stats, None), maxlen=0)
+            cost = (clock() - start - bare) / count
+            best = cost if best is None else min(best, cost)
+        _overhead = max(best, 0.0)
+    return _overhead
+
+def make_profile(profile):
+    # The profile= option as given to process_stream.
+    if profile is True:
+        return PipelineProfile(report=sys.stderr)
+    return profile
+
+
+
+
+
+
+
+
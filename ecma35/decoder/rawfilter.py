@@ -14,10 +14,11 @@ def decode_raw(stream, state):
                 state.docsmode = "raw"
             yield token
         elif state.docsmode == "raw":
-            if token[0] == "ENDSTREAM":
+            if token[0] != "WORD":
+                # i.e. ENDSTREAM, or something else not coming from the byte stream
                 yield token
             else:
-                assert (token[0] == "WORD") and (0 <= token[1] < 256), token
+                assert 0 <= token[1] < 256, token
                 yield ("RAWBYTE", token[1])
         else: # i.e. isn't a DOCS, nor a raw part of the stream
             yield token
@@ -25,6 +26,9 @@ def decode_raw(stream, state):
     #
 #
 
+decode_raw.docsmodes = ("raw",)
+
+
 
 
 
@@ -181,6 +181,9 @@ def decode_scsu(stream, state):
     #
 #
 
+decode_scsu.docsmodes = ("scsu",)
+
+
 
 
 
@@ -104,6 +104,9 @@ def decode_shiftjis(stream, state):
     #
 #
 
+decode_shiftjis.docsmodes = ("shift_jis",)
+
+
 
 
 
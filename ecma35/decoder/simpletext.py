@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Must be at the end of the chain. Counterpart to simple_print which, rather than printing each
+# character as it goes, collects the text in a list and joins it once at the end, yielding it as
+# a single string. Follows the same rules as simple_print, besides the end of the stream not being
+# shown (as U+FFFC), and errors (and isolated surrogates) being handled according to errors:
+#   "replace": U+FFFD, as simple_print does.
+#   "ignore": dropped.
+#   "strict": ValueError raised.
+#   or a callable, given the token and returning the replacement string.
+
+import itertools
+from ecma35.data import controldata
+
+_ignored = frozenset(("DESIG", "RDESIG", "BOM", "DOCS", "RDOCS", "SINGLEOVER", "SCSUSHIFT",
+                      "SCSUDESIG", "C0GRAPH", "CHCP", "ENDSTREAM"))
+_ignored_controls = frozenset(("SI", "SO", "LS0", "LS1", "LS2", "LS3", "LS1R", "LS2R", "LS3R"))
+_rawbytes = tuple("[{:02X}]".format(i) for i in range(256))
+# DEL is left to fall back to U+FFFC, as in simple_print.
+_controls = {name: "" for name in _ignored_controls}
+_controls.update({name: chr(code) for name, code in controldata.rformats.items() if name != "DEL"})
+_controls["LF"] = "\n"
+
+def _error_handler(errors):
+    if callable(errors):
+        return errors
+    elif errors == "replace":
+        return lambda token: "\uFFFD"
+    elif errors == "ignore":
+        return lambda token: ""
+    elif errors == "strict":
+        def strict(token):
+            raise ValueError("undecodable input: {!r}".format(token))
+        return strict
+    raise ValueError("unknown error handling: {!r}".format(errors))
+
+def simple_text_converter(errors="replace"):
+    # Returns a function converting an iterable of tokens to a string, for converting tokens in
+    # batches as they arrive (e.g. from a push-mode Decoder).
+    on_error = _error_handler(errors)
+    controls = _controls
+    def convert(stream):
+        out = []
+        append = out.append
+        for token in stream:
+            kind = token[0]
+            if kind == "CHAR" and token[1]:
+                if token[1] < 0:
+                    raise ValueError("prefix diacritics unhandled")
+                elif token[5][:3] == "WTF": # wobbly UTF, i.e. an isolated surrogate
+                    append(on_error(token))
+                else:
+                    append(chr(token[1]))
+            elif kind == "CHARS":
+                append("".join([chr(i[1]) for i in token[1]]))
+            elif kind == "CTRL":
+                append(controls.get(token[1], "\uFFFC"))
+            elif kind in _ignored:
+                pass
+            elif kind == "COMPCHAR":
+                if token[1][0] < 0:
+                    raise ValueError("prefix diacritics unhandled")
+                append("".join(chr(i) for i in token[1] if i < 0xD800 or i >= 0xE000))
+            elif kind == "RAWBYTE":
+                append(_rawbytes[token[1]])
+            elif kind == "ERROR":
+                append(on_error(token))
+            else:
+                append("\uFFFC")
+        return "".join(out)
+    return convert
+
+def simple_text_maker(errors="replace"):
+    convert = simple_text_converter(errors)
+    def simple_text(stream, state):
+        yield convert(stream)
+    simple_text.accepts_char_runs = True
+    return simple_text
+
+def simple_text_chunker(errors="replace", size=0x1000):
+    # As simple_text_maker, but yielding the text of every size tokens as it goes, so the text of a
+    # long stream is never all held at once (e.g. when writing it out as it is decoded).
+    convert = simple_text_converter(errors)
+    def simple_text_chunks(stream, state):
+        while 1:
+            tokens = list(itertools.islice(stream, size))
+            if not tokens:
+                break
+            yield convert(tokens)
+    simple_text_chunks.accepts_char_runs = True
+    return simple_text_chunks
+
+
+
+
+
+
+
+
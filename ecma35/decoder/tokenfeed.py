@@ -6,27 +6,146 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
-import struct, types
+import struct, types, threading, queue, copy, mmap
 
-def _tokenise_stream(stream, state):
-    state.bytewidth = 1
-    state.feedback = [("DOCS", False, (0x40,))]
-    state.endian = state.default_endian
+# Read granularity of the tokeniser. Words are sliced out of the buffered block rather than read
+# from the stream one code unit at a time.
+_blocksize = 0x10000
+# Most words batched together in a WORDS token (see batching).
+_batchsize = 0x1000
+_unpackers = {(endian, width): struct.Struct(endian + fmt).unpack_from
+              for endian in "<>" for width, fmt in ((2, "H"), (4, "L"))}
+# Inputs which are read in place, rather than being read from like a file.
+_buffer_types = (bytes, bytearray, memoryview, mmap.mmap)
+
+def _tokenise_stream(stream, state, word_runs=None):
+    if state.resume_state is None:
+        state.bytewidth = 1
+        state.feedback = feedback = [("DOCS", False, (0x40,))]
+        state.endian = state.default_endian
+        prefix = b""
+        if isinstance(state.input_profile, str):
+            from ecma35.decoder import inputprofiles
+            prefix = inputprofiles.resolve(state.input_profile)[2]
+    else:
+        # Resuming from a checkpoint (see checkpointindex). This runs after the initialisations at
+        # the start of the other filters, so overrides those too.
+        vars(state).update(copy.deepcopy(state.resume_state))
+        state.feedback = feedback = []
+        prefix = b""
+    if isinstance(stream, PrefixedStream):
+        # Its prefix is read along with any input profile's, and what follows as it would be on its
+        # own (so bytes, &c, are still indexed in place).
+        prefix, stream = prefix + stream._prefix, stream._stream
     assert state.endian in "<>"
+    hook = state.checkpoint_hook
+    # The filters downstream may change the bytewidth and endian (e.g. DOCS switching to UTF-16)
+    # between any two words, so these are consulted afresh for each word. Since nothing is taken
+    # from the buffer besides advancing the offset one word at a time, such a change simply
+    # takes effect from the next word, with the already-buffered bytes being reinterpreted.
+    if isinstance(stream, _buffer_types):
+        # Data in memory (or memory-mapped) is indexed in place, rather than copied out in blocks.
+        # No memoryview is kept of it besides one given, so an mmap can be closed even if the
+        # pipeline was abandoned partway.
+        buffer = stream.cast("B") if isinstance(stream, memoryview) and (
+                     stream.format != "B" or stream.ndim != 1) else stream
+        stream = None
+    else:
+        buffer = memoryview(b"")
+    # The escape sequences which a named input profile starts from (see inputprofiles), and the
+    # prefix of a PrefixedStream, are read before the input, a word at a time, as they would be if
+    # they preceded it.
+    for code in prefix:
+        if feedback:
+            yield from feedback
+            del feedback[:]
+        yield ("WORD", code)
+    offset = 0
+    consumed = 0 # Bytes preceding the current buffer.
     while 1:
-        yield from iter(state.feedback)
-        del state.feedback[:]
-        structmode = state.endian + [..., "B", "H", ..., "L"][state.bytewidth]
-        code = stream.read(state.bytewidth)
-        if not code:
+        if feedback:
+            yield from feedback
+            del feedback[:]
+        if hook is not None:
+            # The next word is being asked for, so the previous one has been passed through each
+            # stage up to the first which reads ahead (gathering GL runs, if on), and any feedback
+            # for it has gone through: the state as those stages left it (the DOCS, bytewidth,
+            # endian, designations and so forth) holds for the bytes from this offset on, which is
+            # thus where decoding could be resumed. The later stages may yet hold tokens from
+            # before it, though, and partial sequences live in the filters' local variables, not
+            # the state (hence checkpointindex verifying its checkpoints).
+            hook(consumed + offset)
+        bytewidth = state.bytewidth
+        while len(buffer) - offset < bytewidth and stream is not None:
+            block = stream.read(_blocksize)
+            if not block:
+                break
+            # Carry over any partial word from the end of the previous block.
+            consumed += offset
+            buffer = memoryview(buffer[offset:].tobytes() + block)
+            offset = 0
+        if offset == len(buffer):
             break
-        code, = struct.unpack(structmode, code)
-        yield ("WORD", code)
+        if bytewidth == 1:
+            if word_runs is not None and not state.batch_holds:
+                pattern = word_runs.get(state.docsmode)
+                match = pattern.match(buffer, offset, offset + _batchsize) if pattern else None
+                if match:
+                    offset = match.end()
+                    yield ("WORDS", match.group())
+                    continue
+            code = buffer[offset]
+            offset += 1
+            yield ("WORD", code)
+        else:
+            # Raises struct.error on a truncated final word, same as unpacking a short read would.
+            code, = _unpackers[state.endian, bytewidth](buffer, offset)
+            offset += bytewidth
+            yield ("WORD", code)
     # End sentinel signals truncation, so the individual filters don't need duplicate handling for
     # encountering the end of the stream as opposed to merely an unexpected token.
     yield ("ENDSTREAM",)
 
+# The stream is a binary file object, or else bytes, a bytearray, a memoryview or an mmap (read in
+# place, so a large file can be decoded without being read into memory first).
 def process_stream(stream, *, lastfilter=None, **kwargs): # The entry point.
+    state = _make_state(kwargs)
+    yield from _build_pipeline(stream, state, lastfilter)
+
+def decode_stream(stream, *, errors="replace", **kwargs):
+    # Decodes a binary stream to a string, following the same rules as simple_print.
+    from ecma35.decoder import simpletext
+    return "".join(process_stream(stream, lastfilter=simpletext.simple_text_maker(errors),
+                                  **kwargs))
+
+def decode(data, *, errors="replace", **kwargs):
+    return decode_stream(data, errors=errors, **kwargs)
+
+class PrefixedStream(object):
+    # A binary stream (or bytes, &c) read after some other bytes, such as escape sequences setting
+    # up the initial DOCS or designations, without reading the stream into memory to join them.
+    # The tokeniser takes the two apart again, so bytes, &c, are indexed in place as usual; read()
+    # is for anything else reading it, and slices them a read's worth at a time.
+    def __init__(self, prefix, stream):
+        self._prefix = prefix
+        self._stream = stream
+        self._offset = 0
+    #
+    def read(self, size=-1):
+        if self._prefix:
+            prefix, self._prefix = self._prefix, b""
+            return prefix
+        elif not isinstance(self._stream, _buffer_types):
+            return self._stream.read(size)
+        with memoryview(self._stream) as view, view.cast("B") as view:
+            end = len(view) if size is None or size < 0 else self._offset + size
+            data = view[self._offset:end].tobytes()
+        self._offset += len(data)
+        return data
+    #
+#
+
+def _make_state(kwargs):
     # DOCS are stipulated in ISO 10646 as big-endian (>). Actually, ISO 10646 does not provide for
     # any means of embedding little-endian UTF data in ECMA-35 (i.e. our regard_bom=0). However,
     # it isn't the last word on this matter (WHATWG stipulates that unmarked UTF-16 is little-
@@ -35,38 +154,380 @@ def process_stream(stream, *, lastfilter=None, **kwargs): # The entry point.
     # generic "switch byte order" control probably isn't, except on trusted data containing
     # misconcatenated UTF-16 (our regard_bom=2).
     statedict = {"osc_bel_term": True, "default_endian": ">", "regard_bom": 1, "bs_compose": True,
-                 "docsmode": None}
+                 "docsmode": None, "resume_state": None,
+                 "checkpoint_hook": None, "profile": None, "gl_runs": True, "batched": True,
+                 "batch_holds": set(), "input_profile": None, "fused": False,
+                 "policy": "replace", "metadata": True,
+                 # Caps on the tokens held back by a single control string, run of prefixed
+                 # diacritics or run of overstrikes, for untrusted input which might never end
+                 # them. None (the default) for no cap, since real control strings can run long
+                 # (OSC 52 clipboard contents, sixel images in a DCS) and mustn't be cut short.
+                 "ctrlstring_cap": None, "diacritic_cap": None, "overstrike_cap": None}
     statedict.update(kwargs)
-    state = types.SimpleNamespace(**statedict)
-    from ecma35.decoder import utf8filter, utf16filter, utf32filter, formateffectors, \
-       controlsets, fixedcontrols, invocations, gccsequences, elexfilter, prefixdiacritics, \
-       designations, graphsets, simpleprinter, escsequences, csisequences, controlstrings, \
-       rawfilter, unkdocsfilter, ecma35docsfilter, hangulfillers, utf1filter, shiftjisfilter, \
-       scsufilter, uhcfilter, gbkfilter, gbhalfcodes, plainextasciifilter, bigfivefilter, \
-       bssequences, ebcdicfilter, docssequences, chcpsequences, utfebcdicfilter, modeucfilter, \
-       delimiters, eightonesterminatedfilter
-    for f in [_tokenise_stream, docssequences.decode_docs_sequences, 
-              chcpsequences.decode_chcp, docssequences.proc_docs_sequence_stack, 
-              ecma35docsfilter.decode_ecma35docs, utf8filter.decode_utf8, 
-              utf1filter.decode_utf1, shiftjisfilter.decode_shiftjis, utf32filter.decode_utf32, 
-              scsufilter.decode_scsu, uhcfilter.decode_uhc, gbkfilter.decode_gbk,
-              elexfilter.decode_elex, plainextasciifilter.decode_plainextascii,
-              bigfivefilter.decode_bigfive, ebcdicfilter.decode_ebcdic, 
-              utfebcdicfilter.decode_utfebcdic, utf16filter.decode_utf16, 
-              rawfilter.decode_raw, modeucfilter.decode_modeuc, 
-              eightonesterminatedfilter.decode_eight_ones_terminated, 
-              unkdocsfilter.decode_remaining_docs, 
+    return types.SimpleNamespace(**statedict)
+
+# Input profiles (input_profile, a collection of docsmode names, the name of one of the profiles in
+# inputprofiles, or None for all) allow stages which could only apply to other DOCS to be left out
+# of the pipeline: the DOCS filters owning only other docsmodes, and the stages which only do
+# anything in a particular docsmode (indicated by an only_in_docsmodes attribute). The filter for
+# ECMA-35 itself, that for unrecognised DOCS, and those which take over from the others (indicated
+# by a consumes attribute) are always kept, and a switch to any other DOCS gives an ERROR. Named
+# profiles may also leave out some of the later stages. The stages
+# for each combination of options are worked out once and cached; with fused=True, which is ignored
+# when profiling, they are then fused together where possible (see fusion). This is off by default,
+# since generating the fused filters takes a good part of a second the first time, which only long
+# inputs make back.
+_plans = {}
+
+def _docs_filters():
+    from ecma35.decoder import utf8filter, utf16filter, utf32filter, elexfilter, rawfilter, \
+       unkdocsfilter, ecma35docsfilter, utf1filter, shiftjisfilter, scsufilter, uhcfilter, \
+       gbkfilter, plainextasciifilter, bigfivefilter, ebcdicfilter, utfebcdicfilter, \
+       modeucfilter, eightonesterminatedfilter
+    return [ecma35docsfilter.decode_ecma35docs, utf8filter.decode_utf8, 
+            utf1filter.decode_utf1, shiftjisfilter.decode_shiftjis, utf32filter.decode_utf32, 
+            scsufilter.decode_scsu, uhcfilter.decode_uhc, gbkfilter.decode_gbk,
+            elexfilter.decode_elex, plainextasciifilter.decode_plainextascii,
+            bigfivefilter.decode_bigfive, ebcdicfilter.decode_ebcdic, 
+            utfebcdicfilter.decode_utfebcdic, utf16filter.decode_utf16, 
+            rawfilter.decode_raw, modeucfilter.decode_modeuc, 
+            eightonesterminatedfilter.decode_eight_ones_terminated, 
+            unkdocsfilter.decode_remaining_docs]
+
+def _in_profile(f, docsmodes):
+    if docsmodes is None:
+        return True
+    elif hasattr(f, "only_in_docsmodes"):
+        return not docsmodes.isdisjoint(f.only_in_docsmodes)
+    elif hasattr(f, "docsmodes"):
+        return (not docsmodes.isdisjoint(f.docsmodes) or hasattr(f, "consumes") or
+                "Unknown" in f.docsmodes)
+    return True
+
+def _plan_pipeline(state, lastfilter, profile):
+    # The word_runs for the tokeniser, and the stages after it, before the lastfilter.
+    from ecma35.decoder import inputprofiles
+    docsmodes, omitted, prefix = inputprofiles.resolve(state.input_profile)
+    expand_char_runs = state.gl_runs and not getattr(lastfilter, "accepts_char_runs", False)
+    fused = state.fused and not profile
+    key = (docsmodes, omitted, bool(state.batched), bool(state.gl_runs), bool(expand_char_runs),
+           bool(fused), state.policy, bool(state.metadata))
+    try:
+        return _plans[key]
+    except KeyError:
+        pass
+    from ecma35.decoder import formateffectors, controlsets, fixedcontrols, invocations, \
+       gccsequences, prefixdiacritics, designations, graphsets, escsequences, csisequences, \
+       controlstrings, hangulfillers, gbhalfcodes, bssequences, docssequences, chcpsequences, \
+       delimiters, docsrouter, glruns, batching, fusion, policies
+    docs_filters = [f for f in _docs_filters() if _in_profile(f, docsmodes)]
+    docs_router = docsrouter.docs_router_maker(docs_filters)
+    # Runs of words are batched (see batching) in the DOCS whose filters say how, unless turned off.
+    word_runs = {docsmode: f.word_runs for f in docs_filters
+                 if hasattr(f, "word_runs") for docsmode in f.docsmodes} if state.batched else None
+    # Runs of plain GL characters are handled in bulk (see glruns) unless turned off.
+    gather_gl_runs = [glruns.gather_gl_runs] if state.gl_runs else []
+    # Bookkeeping tokens are dropped after the last stages acting upon them (see policies).
+    drop_docs_metadata = [] if state.metadata else [policies.drop_docs_metadata]
+    drop_designation_metadata = [] if state.metadata else [policies.drop_designation_metadata]
+    stages = []
+    batched = state.batched
+    refuse_docs = [] if docsmodes is None else [inputprofiles.refuse_unsupported_docs]
+    for f in [docssequences.decode_docs_sequences, 
+              chcpsequences.decode_chcp, *refuse_docs, docssequences.proc_docs_sequence_stack, 
+              docs_router, *drop_docs_metadata,
               #
               designations.decode_designations, gbhalfcodes.decode_gbhalfcodes, 
               controlsets.decode_control_sets, fixedcontrols.decode_fixed_controls, 
               escsequences.decode_esc_sequences, csisequences.decode_csi_sequences, 
               controlstrings.decode_control_strings, delimiters.decode_delimiters,
-              invocations.decode_invocations, graphsets.decode_graphical_sets, 
-              formateffectors.format_effectors, prefixdiacritics.handle_prefix_diacritics,
+              invocations.decode_invocations, *gather_gl_runs, graphsets.decode_graphical_sets, 
+              *drop_designation_metadata, formateffectors.format_effectors,
+              prefixdiacritics.handle_prefix_diacritics,
               gccsequences.proc_gcc_sequences, hangulfillers.proc_hangul_fillers,  
-              bssequences.proc_bs_sequences, lastfilter or simpleprinter.simple_print]:
+              bssequences.proc_bs_sequences]:
+        if not _in_profile(f, docsmodes) or f.__module__.rpartition(".")[2] in omitted:
+            continue
+        if batched and not getattr(f, "handles_batches", False):
+            stages.append(batching.expand_batches)
+            batched = False
+        stages.append(f)
+    if expand_char_runs:
+        stages.append(glruns.expand_char_runs)
+    # ERROR tokens are dealt with according to the policy just before the lastfilter.
+    stages.extend(policies.policy_filters(state.policy))
+    if fused:
+        stages = fusion.fuse_stages(stages)
+    plan = _plans[key] = (word_runs, tuple(stages))
+    return plan
+
+def _build_pipeline(stream, state, lastfilter):
+    from ecma35.decoder import simpleprinter
+    profile = None
+    if state.profile:
+        from ecma35.decoder import profiling
+        profile = state.profile = profiling.make_profile(state.profile)
+    lastfilter = lastfilter or simpleprinter.simple_print
+    word_runs, stages = _plan_pipeline(state, lastfilter, profile)
+    return _assemble_pipeline(stream, state, lastfilter, word_runs, stages, profile)
+
+def _assemble_pipeline(stream, state, lastfilter, word_runs, stages, profile=None):
+    stream = _tokenise_stream(stream, state, word_runs)
+    if profile:
+        stream = profile.wrap(_tokenise_stream, stream)
+    for f in stages:
         stream = f(stream, state)
-    yield from stream
+        if profile:
+            stream = profile.wrap(f, stream)
+    if profile:
+        return profile.wrap(lastfilter, lastfilter(stream, state))
+    return lastfilter(stream, state)
+
+# Push-mode counterpart to process_stream, for data arriving in pieces (e.g. from a socket). Since
+# the filters pull their input, the pipeline runs in a worker thread which blocks whenever it has
+# consumed all the data fed so far; feed() returns once it has done so. The state and filters are
+# thus kept alive between calls, and each call only processes the newly fed data.
+#
+# Each handoff to the worker and back costs a couple of thread switches, which outweighs decoding
+# the data when it arrives in small pieces (a few bytes at a time, say). With a handoff_size, data
+# is instead held in the caller's thread until at least that many bytes are pending (or until
+# flush), and handed over together, at the cost of the tokens from it arriving with a later call.
+class Decoder(object):
+    def __init__(self, *, lastfilter=None, handoff_size=0, **kwargs):
+        # Gathering runs of GL characters would hold them back until the data after them is fed.
+        self.state = _make_state(dict({"gl_runs": False}, **kwargs))
+        self._inbox = queue.Queue()
+        self._outbox = queue.Queue()
+        self._tokens = []
+        self._done = False
+        self._handoff_size = handoff_size
+        self._held = bytearray()
+        reader = _PushReader(self._inbox, self._outbox)
+        pipeline = _build_pipeline(reader, self.state, lastfilter or (lambda stream, state: stream))
+        # The worker mustn't hold a reference to self, lest an abandoned Decoder never be closed.
+        self._thread = threading.Thread(target=_push_worker,
+                                        args=(pipeline, self._tokens, self._outbox), daemon=True)
+        self._thread.start()
+    #
+    def _exchange(self, data):
+        if self._done:
+            raise ValueError("decoder has already been flushed or closed")
+        self._inbox.put(data)
+        signal, exception = self._outbox.get()
+        if signal is _finished:
+            self._done = True
+        tokens = self._tokens[:]
+        del self._tokens[:]
+        if exception is not None:
+            raise exception
+        return tokens
+    #
+    def feed(self, data):
+        # Returns the tokens which can be completed from the data handed over so far.
+        if not self._handoff_size:
+            return self._exchange(bytes(data))
+        elif self._done:
+            raise ValueError("decoder has already been flushed or closed")
+        self._held += data
+        if len(self._held) < self._handoff_size:
+            return []
+        data = bytes(self._held)
+        del self._held[:]
+        return self._exchange(data)
+    #
+    def flush(self):
+        # Ends the stream, returning the remaining tokens (including any truncation errors).
+        tokens = []
+        if self._held:
+            tokens = self._exchange(bytes(self._held))
+            del self._held[:]
+        return tokens + self._exchange(None)
+    #
+    def close(self):
+        # Abandons the stream without flushing it.
+        if not self._done:
+            self._done = True
+            self._inbox.put(_closed)
+    #
+    def __del__(self):
+        self.close()
+    #
+#
+
+# Reusable counterpart to decode, for decoding many short documents (such as email headers or
+# database rows) with the same options, where setting up the pipeline would otherwise outweigh the
+# decoding itself. Each document still needs a fresh generator for each filter, since generators
+# can't be rewound, but everything else is done once up front: checking and merging the options,
+# planning the stages and making the lastfilter. Each document starts from the same state, which is
+# a fresh start unless reset is given a snapshot (as from checkpointindex) to resume from instead.
+class Pipeline(object):
+    def __init__(self, *, errors="replace", **kwargs):
+        from ecma35.decoder import simpletext
+        state = _make_state(kwargs)
+        self._lastfilter = simpletext.simple_text_maker(errors)
+        self._profiled = bool(state.profile)
+        if not self._profiled:
+            self._word_runs, self._stages = _plan_pipeline(state, self._lastfilter, None)
+        # The batch_holds set is the only value changed in place during decoding.
+        del state.batch_holds
+        self._template = vars(state)
+    #
+    def reset(self, initial_state=None):
+        # Sets the state which subsequent documents start from (None for a fresh start).
+        self._template["resume_state"] = initial_state
+    #
+    def decode(self, data):
+        state = types.SimpleNamespace(**self._template)
+        state.batch_holds = set()
+        if self._profiled:
+            pipeline = _build_pipeline(data, state, self._lastfilter)
+        else:
+            pipeline = _assemble_pipeline(data, state, self._lastfilter,
+                                          self._word_runs, self._stages)
+        return "".join(pipeline)
+    #
+    def decode_many(self, documents):
+        # Yields the text of each of the given documents (bytes-like objects), in the same order.
+        decode = self.decode
+        for data in documents:
+            yield decode(data)
+    #
+#
+
+# Asynchronous counterpart to process_stream, taking an asyncio.StreamReader. This is a wrapper
+# around a thread, not a pipeline driven on the event loop: the filters pull their input
+# synchronously, and any partial sequence lives in their generators' local variables, so they can't
+# be suspended partway to await more data. The pipeline therefore runs in a thread of its own (not
+# the event loop's, nor one of its executor's, which a long-lived stream would tie up), reading
+# through an _AsyncReader. Each time it runs out of data, it hands the loop the tokens completed so
+# far along with a request for more, and waits for the loop to read whatever the reader has
+# available (up to a block) and hand it back. That is one handoff each way per read, rather than
+# the two of awaiting a Decoder in an executor, but the thread switches are not done away with, and
+# it is little faster than that (see scripts/benchasync.py); its gain is that the event loop is
+# never blocked, not even by a partial sequence. Where the reader only has a little available at a
+# time, a handoff_size can be given as for the Decoder, the loop then reading until at least that
+# many bytes are pending (or the stream ends) before handing them over.
+async def process_stream_async(reader, *, lastfilter=None, handoff_size=0, **kwargs):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    # Gathering runs of GL characters would hold them back until the data after them is read.
+    state = _make_state(dict({"gl_runs": False}, **kwargs))
+    requests = asyncio.Queue()
+    tokens = []
+    source = _AsyncReader(loop, requests, tokens)
+    pipeline = _build_pipeline(source, state, lastfilter or (lambda stream, state: stream))
+    threading.Thread(target=_async_worker, args=(pipeline, tokens, source),
+                     daemon=True).start()
+    try:
+        while 1:
+            signal, batch, exception = await requests.get()
+            for token in batch:
+                yield token
+            if signal is _finished:
+                if exception is not None:
+                    raise exception
+                return
+            data = await reader.read(_blocksize)
+            while data and len(data) < handoff_size:
+                more = await reader.read(_blocksize)
+                if not more:
+                    break
+                data += more
+            source.inbox.put(data)
+    finally:
+        source.close()
+
+_starved = object()
+_finished = object()
+_closed = object()
+
+class _DecoderClosed(Exception):
+    pass
+
+class _PushReader(object):
+    def __init__(self, inbox, outbox):
+        self._inbox = inbox
+        self._outbox = outbox
+        self._pending = memoryview(b"")
+        self._offset = 0
+        self._owed = False # i.e. whether feed() is waiting on us to run out of data
+        self._eof = False
+    def read(self, size):
+        while self._offset == len(self._pending) and not self._eof:
+            if self._owed:
+                self._outbox.put((_starved, None))
+            data = self._inbox.get()
+            self._owed = True
+            if data is _closed:
+                raise _DecoderClosed()
+            elif data is None:
+                self._eof = True
+            else:
+                self._pending = memoryview(data)
+                self._offset = 0
+        data = self._pending[self._offset:self._offset + size].tobytes()
+        self._offset += len(data)
+        return data
+
+class _AsyncReader(object):
+    # Runs in the worker thread of process_stream_async, handing the tokens completed so far to
+    # the event loop with each request for data.
+    def __init__(self, loop, requests, tokens):
+        self.inbox = queue.Queue()
+        self._loop = loop
+        self._requests = requests
+        self._tokens = tokens
+        self._closed = False
+        self._eof = False
+    def send(self, signal, exception=None):
+        tokens = self._tokens[:]
+        del self._tokens[:]
+        try:
+            self._loop.call_soon_threadsafe(self._requests.put_nowait,
+                                            (signal, tokens, exception))
+        except RuntimeError: # The event loop has been closed.
+            raise _DecoderClosed()
+    def read(self, size):
+        if self._eof:
+            return b""
+        elif self._closed:
+            raise _DecoderClosed()
+        self.send(_starved)
+        data = self.inbox.get()
+        if data is _closed:
+            raise _DecoderClosed()
+        self._eof = not data
+        return data
+    def close(self):
+        self._closed = True
+        self.inbox.put(_closed)
+
+def _async_worker(pipeline, tokens, source):
+    try:
+        for token in pipeline:
+            tokens.append(token)
+    except _DecoderClosed:
+        return
+    except BaseException as exception:
+        signal = (_finished, exception)
+    else:
+        signal = (_finished, None)
+    try:
+        source.send(*signal)
+    except _DecoderClosed:
+        pass
+
+def _push_worker(pipeline, tokens, outbox):
+    try:
+        for token in pipeline:
+            tokens.append(token)
+    except _DecoderClosed:
+        return
+    except BaseException as exception:
+        outbox.put((_finished, exception))
+    else:
+        outbox.put((_finished, None))
+
 
 
 
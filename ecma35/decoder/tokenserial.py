@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Compact binary serialisation of token streams, so the tokens from decoding something can be saved
+# and replayed later without decoding it again. token_writer makes a lastfilter writing the tokens
+# to a binary file (and passing them on unchanged); replay reads them back, as an iterator which
+# can be given to a lastfilter, or to any of the later stages, in place of the pipeline.
+#
+# The same tokens turn up over and over (the same character from the same set, the same control,
+# and so forth), so each distinct token is only written out once, to a table, and the stream itself
+# is written as numbers in that table. Replaying therefore gives the same token object each time a
+# token recurs (which, tokens being tuples, is no different to the filters), and doesn't need to
+# build the tokens afresh, which is where most of the time goes in unpickling a list of them.
+#
+# For the table, each token is split into a skeleton and its fields. The skeleton is the token with
+# each integer in it (at whatever depth), each string besides the token type, and each token within
+# it (such as the sequence making up a CSISEQ, or the characters of a COMPCHAR), replaced with a
+# placeholder. Strings are written to a table of their own the first time they are used, and given
+# by number thereafter (so set names and so forth appear but once), as are skeletons, and tokens
+# within tokens are given by number in the table of tokens. New tokens with the same skeleton are
+# written together, sorted, with one column for each field, so the tokens can be rebuilt by zipping
+# the columns together without running any Python code per token. Each column is written as a
+# single value if they are all the same, or else as an array of the narrowest type which fits it,
+# either of the values as they are or (for integers from the tokens) of the differences between
+# successive values (so code points from the same set mostly take a byte apiece). Tokens whose
+# skeleton is seldom used are written as they are.
+#
+# The tokens are written in chunks, each compressed with zlib and holding the new skeletons,
+# strings and tokens used in it. The chunks are written with marshal, so (as with marshal itself)
+# the files are meant for keeping between runs, not for interchange, nor for data from untrusted
+# sources. Tokens may contain tuples, strings, integers, bytes, booleans and None. Any subclasses
+# of these are written as the plain types.
+
+import marshal, array, itertools, operator, collections, zlib, sys
+
+_magic = b"ECMA35TOKENS\x01"
+_chunk_size = 0x4000
+_min_uses = 32 # New tokens with a skeleton in a chunk, for them not to be written as they are.
+_length_bytes = 4
+_typecodes = ("B", "b", "H", "h", "I", "i", "Q", "q")
+_constants = (bytes, bool, type(None)) # Not float, lest 1.0 be taken for True.
+# Placeholders in skeletons, which can't be mistaken for any constant in a token (as 0 could be for
+# False, say).
+_integer, _string, _token = (frozenset(("integer",)), frozenset(("string",)),
+                             frozenset(("token",)))
+
+def _typecode(values):
+    # The narrowest array type holding all the values, if any does.
+    low, high = min(values), max(values)
+    for typecode in _typecodes:
+        bits = array.array(typecode).itemsize * 8
+        if typecode.islower():
+            if low >= -(1 << (bits - 1)) and high < (1 << (bits - 1)):
+                return typecode
+        elif low >= 0 and high < (1 << bits):
+            return typecode
+    return None
+
+def _array(typecode, values):
+    packed = array.array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+def _pack(values, deltas=False, repeats=True):
+    # A column, as the shortest of the forms which _unpack takes, or ("=", value) if the values are
+    # all the same (unless repeats is false).
+    if repeats and values.count(values[0]) == len(values):
+        return ("=", values[0])
+    forms = [("l", values)]
+    typecode = _typecode(values)
+    if typecode:
+        forms.append(("a", typecode, _array(typecode, values)))
+    if deltas:
+        differences = list(map(operator.sub, values[1:], values[:-1]))
+        typecode = _typecode(differences)
+        if typecode:
+            forms.append(("d", values[0], typecode, _array(typecode, differences)))
+    return min(forms, key=lambda form: len(form[-1]) if form[0] != "l" else 9 * len(values))
+
+def _unpack(column):
+    form = column[0]
+    if form == "l":
+        return column[1]
+    values = array.array(column[-2])
+    values.frombytes(column[-1])
+    if sys.byteorder == "big":
+        values.byteswap()
+    if form == "d":
+        return itertools.accumulate(values, initial=column[1])
+    return values
+
+def _literal(value):
+    # The value with any subclass replaced, as a skeleton would have it.
+    if type(value) is tuple:
+        return tuple([_literal(i) for i in value])
+    elif type(value) in _constants or type(value) in (int, str):
+        return value
+    elif isinstance(value, str):
+        return str(value)
+    return int(value) # Anything else was refused by _Writer.skeleton.
+
+def _lookup(table, numbers):
+    # The items with the given numbers, all at once, which is faster than one at a time.
+    numbers = tuple(numbers)
+    if len(numbers) == 1:
+        return (table[numbers[0]],)
+    return operator.itemgetter(*numbers)(table)
+
+def _builder(skeleton, columns, strings, tokens):
+    # An iterable of the values for the skeleton, taking columns in order from the iterator, or
+    # (if none of them vary) the value itself, with a false first item.
+    if type(skeleton) is frozenset:
+        column = next(columns)
+        table = tokens if skeleton == _token else strings if skeleton == _string else None
+        if column[0] == "=":
+            return False, (table[column[1]] if table is not None else column[1])
+        column = _unpack(column)
+        return True, (_lookup(table, column) if table is not None else column)
+    elif type(skeleton) is tuple:
+        parts = [_builder(i, columns, strings, tokens) for i in skeleton]
+        if any(varies for varies, part in parts):
+            return True, zip(*[part if varies else itertools.repeat(part)
+                               for varies, part in parts])
+        return False, tuple([part for varies, part in parts])
+    return False, skeleton
+
+class _Writer(object):
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.tokens = {} # Key (skeleton and fields) to number in the table of tokens.
+        self.skeletons = {} # Skeleton to number.
+        self.strings = {} # String to number.
+        self.pending = [] # Key for each token in the current chunk.
+        self.new = {} # Key to (level, token), for those new in the current chunk.
+        f.write(_magic)
+    #
+    def key(self, token):
+        # Tokens within tokens are written to the table at a level above any they contain, so they
+        # are read back before the tokens containing them. The token type is kept in the skeleton,
+        # since it is all but fixed by the rest of it.
+        fields, levels = [], [-1]
+        key = ((str(token[0]),) + self.skeleton(token[1:], fields, levels), tuple(fields))
+        if key not in self.tokens and key not in self.new:
+            self.new[key] = (max(levels) + 1, token)
+        return key
+    #
+    def skeleton(self, value, fields, levels):
+        if type(value) is int:
+            fields.append(value)
+            return _integer
+        elif type(value) is str:
+            fields.append(value)
+            return _string
+        elif type(value) is tuple:
+            # Any tuple within starting with a string is taken for a token.
+            return tuple([self.skeleton(i, fields, levels) if type(i) is not tuple or not i or
+                          not isinstance(i[0], str) else self.reference(i, fields, levels)
+                          for i in value])
+        elif type(value) in _constants:
+            return value
+        elif isinstance(value, str):
+            fields.append(str(value))
+            return _string
+        elif isinstance(value, int) and not isinstance(value, bool):
+            fields.append(int(value))
+            return _integer
+        raise TypeError("cannot serialise {!r} in a token".format(value))
+    #
+    def reference(self, token, fields, levels):
+        key = self.key(token)
+        fields.append(key)
+        levels.append(self.new[key][0] if key in self.new else -1)
+        return _token
+    #
+    def add(self, token):
+        self.pending.append(self.key(token))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+    #
+    def number(self, field, strings):
+        # A field as an integer.
+        if type(field) is int:
+            return field
+        elif type(field) is tuple:
+            return self.tokens[field]
+        number = self.strings.get(field, None)
+        if number is None:
+            number = self.strings[field] = len(self.strings)
+            strings.append(field)
+        return number
+    #
+    def flush(self):
+        if not self.pending:
+            return
+        skeletons, strings, groups = [], [], []
+        grouped = collections.defaultdict(list)
+        for key, (level, token) in self.new.items():
+            grouped[level, key[0]].append(key)
+        for level, skeleton in sorted(grouped, key=lambda group: group[0]):
+            keys = grouped[level, skeleton]
+            if len(keys) < _min_uses:
+                # Written as they are, as a group with no skeleton number.
+                for key in keys:
+                    self.tokens[key] = len(self.tokens)
+                groups.append((None, len(keys), tuple(_literal(self.new[key][1]) for key in keys)))
+                continue
+            number = self.skeletons.get(skeleton, None)
+            if number is None:
+                number = self.skeletons[skeleton] = len(self.skeletons)
+                skeletons.append(skeleton)
+            rows = sorted((tuple(self.number(i, strings) for i in key[1]), key) for key in keys)
+            columns = tuple(_pack(list(column), deltas=type(field) is int)
+                            for column, field in zip(zip(*[row[0] for row in rows]), keys[0][1]))
+            for row in rows:
+                self.tokens[row[1]] = len(self.tokens)
+            groups.append((number, len(keys), columns))
+        chunk = (tuple(skeletons), tuple(strings), tuple(groups),
+                 _pack([self.tokens[key] for key in self.pending], repeats=False))
+        chunk = zlib.compress(marshal.dumps(chunk))
+        self.f.write(len(chunk).to_bytes(_length_bytes, "little") + chunk)
+        self.pending = []
+        self.new = {}
+    #
+    def close(self):
+        self.flush()
+        self.f.write(bytes(_length_bytes)) # Marks the end, so truncated files are noticed.
+    #
+#
+
+def token_writer(f, *, chunk_size=_chunk_size):
+    # Makes a lastfilter writing the tokens to the binary file f. The file is only complete once
+    # the tokens are exhausted.
+    def write_tokens(stream, state):
+        writer = _Writer(f, chunk_size)
+        for token in stream:
+            writer.add(token)
+            yield token
+        writer.close()
+    return write_tokens
+
+def dump(tokens, f, *, chunk_size=_chunk_size):
+    writer = _Writer(f, chunk_size)
+    for token in tokens:
+        writer.add(token)
+    writer.close()
+
+def _chunks(f):
+    skeletons, strings, tokens = [], [], []
+    islice, repeat = itertools.islice, itertools.repeat
+    while 1:
+        length = f.read(_length_bytes)
+        length = int.from_bytes(length, "little") if len(length) == _length_bytes else None
+        chunk = f.read(length) if length else b""
+        if length is None or len(chunk) != length:
+            raise ValueError("token stream file is truncated")
+        elif not length:
+            break
+        new_skeletons, new_strings, groups, numbers = marshal.loads(
+                zlib.decompress(chunk))
+        skeletons.extend(new_skeletons)
+        strings.extend(new_strings)
+        for number, count, columns in groups:
+            if number is None:
+                tokens.extend(columns)
+                continue
+            varies, built = _builder(skeletons[number], iter(columns), strings, tokens)
+            tokens.extend(islice(built, count) if varies else repeat(built, count))
+        yield _lookup(tokens, _unpack(numbers))
+
+def replay(f):
+    # An iterator over the tokens from the binary file f, as written by token_writer or dump.
+    if f.read(len(_magic)) != _magic:
+        raise ValueError("not a token stream file")
+    return itertools.chain.from_iterable(_chunks(f))
+
+def load(f):
+    return list(replay(f))
+
+def replay_stream(f, *, lastfilter=None, **kwargs):
+    # As process_stream, but with the tokens replayed from the binary file f rather than decoded.
+    # The policy option applies as in process_stream; metadata=False drops the same tokens, but
+    # after all the stages (see policies).
+    from ecma35.decoder import tokenfeed, simpleprinter, policies
+    state = tokenfeed._make_state(kwargs)
+    stream = replay(f)
+    if not state.metadata:
+        stream = policies.drop_metadata(stream, state)
+    for policy_filter in policies.policy_filters(state.policy):
+        stream = policy_filter(stream, state)
+    yield from (lastfilter or simpleprinter.simple_print)(stream, state)
+
+
+
+
+
+
+
+
+
+
@@ -110,6 +110,9 @@ def decode_uhc(stream, state):
     #
 #
 
+decode_uhc.docsmodes = ("uhc",)
+
+
 
 
 
@@ -35,6 +35,10 @@ def decode_remaining_docs(stream, state):
     #
 #
 
+decode_remaining_docs.docsmodes = ("Unknown",)
+decode_remaining_docs.consumes = ("DOCS",) # i.e. any not recognised upstream.
+
+
 
 
 
@@ -107,6 +107,10 @@ def decode_utf16(stream, state):
     #
 #
 
+decode_utf16.docsmodes = ("utf-16",)
+decode_utf16.consumes = ("CESU", "PAIR") # Regardless of which docsmode is active.
+
+
 
 
 
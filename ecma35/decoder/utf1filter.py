@@ -119,6 +119,9 @@ def decode_utf1(stream, state):
     #
 #
 
+decode_utf1.docsmodes = ("utf-1",)
+
+
 
 
 
@@ -42,6 +42,9 @@ def decode_utf32(stream, state):
     #
 #
 
+decode_utf32.docsmodes = ("utf-32",)
+
+
 
 
 
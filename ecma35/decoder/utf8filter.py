@@ -6,6 +6,10 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import re
+
+_ascii_tokens = tuple(("UCS", i, "UTF-8", "ASCII") for i in range(0x80))
+
 def decode_utf8(stream, state):
     utf8_brot = []
     utf8_seeking = 0
@@ -27,7 +31,19 @@ def decode_utf8(stream, state):
                 state.docsmode = "utf-8"
             yield token
         elif state.docsmode == "utf-8":
-            if not utf8_brot:
+            if token[0] == "WORDS":
+                # Run of well-formed characters, matched by word_runs (see batching).
+                if utf8_brot:
+                    yield ("ERROR", "UTF8TRUNCATE", tuple(utf8_brot))
+                    del utf8_brot[:]
+                    firstchar = False
+                batch = [_ascii_tokens[ucs] if ucs < 0x80 else ("UCS", ucs, "UTF-8", "UTF-8")
+                         for ucs in map(ord, token[1].decode("utf-8"))]
+                if firstchar and batch[0][1] == 0xFEFF:
+                    batch[0] = ("BOM", None)
+                firstchar = False
+                yield ("BATCH", tuple(batch))
+            elif not utf8_brot:
                 if token[0] != "WORD":
                     # ESC passing through
                     yield token
@@ -101,6 +117,15 @@ def decode_utf8(stream, state):
     #
 #
 
+decode_utf8.docsmodes = ("utf-8",)
+decode_utf8.handles_batches = True
+# Excludes the C1 controls, overlong forms, surrogates and anything beyond U+10FFFF.
+decode_utf8.word_runs = re.compile(
+    rb"(?:[\x20-\x7E]|\xC2[\xA0-\xBF]|[\xC3-\xDF][\x80-\xBF]|\xE0[\xA0-\xBF][\x80-\xBF]|"
+    rb"[\xE1-\xEC\xEE\xEF][\x80-\xBF]{2}|\xED[\x80-\x9F][\x80-\xBF]|"
+    rb"\xF0[\x90-\xBF][\x80-\xBF]{2}|[\xF1-\xF3][\x80-\xBF]{3}|\xF4[\x80-\x8F][\x80-\xBF]{2})+")
+
+
 
 
 
@@ -108,3 +108,6 @@ def decode_utfebcdic(stream, state):
     #
 #
 
+decode_utfebcdic.docsmodes = ("utf-ebcdic",)
+
+
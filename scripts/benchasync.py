@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Feeds the test.py input (repeated) through an asyncio.StreamReader in messages of various sizes,
+#   each arriving on its own turn of the event loop, and decodes it with process_stream_async and
+#   with a push-mode Decoder whose feeds are awaited in the loop's default executor (so that each
+#   read is handed to an executor thread and on to the Decoder's worker, and back), giving the time
+#   taken by each, and checking that the tokens are the same as process_stream gives. Both run the
+#   pipeline in another thread, so the difference is only in the handoffs, and is expected to be
+#   small: process_stream_async is not a pipeline driven on the event loop.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time, asyncio
+from ecma35.decoder import tokenfeed
+from test import dat
+
+data = dat * 20
+
+def passthrough(stream, state):
+    return stream
+
+async def produce(reader, message_size):
+    for offset in range(0, len(data), message_size):
+        reader.feed_data(data[offset:offset + message_size])
+        await asyncio.sleep(0)
+    reader.feed_eof()
+
+async def executor_decoder(reader):
+    loop = asyncio.get_running_loop()
+    decoder = tokenfeed.Decoder()
+    try:
+        while 1:
+            piece = await reader.read(0x10000)
+            if not piece:
+                break
+            for token in await loop.run_in_executor(None, decoder.feed, piece):
+                yield token
+        for token in await loop.run_in_executor(None, decoder.flush):
+            yield token
+    finally:
+        decoder.close()
+
+async def consume(decode, message_size):
+    reader = asyncio.StreamReader()
+    producer = asyncio.ensure_future(produce(reader, message_size))
+    start = time.perf_counter()
+    tokens = [token async for token in decode(reader)]
+    seconds = time.perf_counter() - start
+    await producer
+    return tokens, seconds
+
+def best(decode, message_size):
+    return min((asyncio.run(consume(decode, message_size)) for i in range(3)),
+               key=lambda result: result[1])
+
+expected = list(tokenfeed.process_stream(data, lastfilter=passthrough, gl_runs=False))
+print("{} bytes".format(len(data)))
+print("{:>8} {:>10} {:>12} {:>12} {:>8}".format("Message", "Messages", "Executor", "Async",
+                                                 "Speedup"))
+for message_size in (16, 256, 4096, 0x10000):
+    results = []
+    for decode in (executor_decoder, tokenfeed.process_stream_async):
+        tokens, seconds = best(decode, message_size)
+        assert tokens == expected, "tokens differ ({}, {} byte messages)".format(
+                                   decode.__name__, message_size)
+        results.append(seconds)
+    print("{:>8} {:>10} {:>10.3f} s {:>10.3f} s {:>7.2f}x".format(
+          message_size, -(-len(data) // message_size), results[0], results[1],
+          results[0] / results[1]))
+print("Tokens identical.")
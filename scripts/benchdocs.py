@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Measures the throughput (MB/s and tokens/s) and peak memory (as traced by tracemalloc) of the
+#   decoder for each DOCS in turn, on a corpus for each built from the mapping files in mbmaps,
+#   and compares these against the stored baseline in benchdocs.json, flagging regressions.
+# Usage: benchdocs.py [megabytes per corpus] [--update] [--tolerance=fraction]
+#   --update rewrites the baseline from this run, recording the last commit changing the package
+#   (per git) and the Python version it was taken with. Baselines are only meaningful on the
+#   machine they were taken on, so update it before comparing on a different one, and after any
+#   change meant to speed things up, lest a later regression hide behind the gain.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, json, time, tracemalloc, platform, subprocess
+from ecma35.decoder import tokenfeed, utfebcdicfilter
+
+mbmaps = os.path.join(os.pardir, "ecma35", "data", "multibyte", "mbmaps")
+baseline_file = "benchdocs.json"
+
+args = [i for i in sys.argv[1:] if not i.startswith("--")]
+flags = dict((i[2:].split("=", 1) + [True])[:2] for i in sys.argv[1:] if i.startswith("--"))
+megabytes = float(args[0]) if args else 0.1
+tolerance = float(flags.get("tolerance", 0.15))
+
+def read_mapping(name, codecolumn=0, ucscolumn=1, pointers=False):
+    # Returns (code, ucs) pairs from a UTC-style (hex columns) or WHATWG-style (pointer) file,
+    #   omitting any with multiple or no Unicode codepoints.
+    pairs = []
+    with open(os.path.join(mbmaps, name), "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].split()
+            if len(line) <= max(codecolumn, ucscolumn):
+                continue
+            code = int(line[codecolumn], 10 if pointers else 16)
+            ucs = line[ucscolumn]
+            if "+" in ucs[2:]:
+                continue
+            pairs.append((code, int(ucs[2:], 16)))
+    return pairs
+
+def dbcs(code):
+    return bytes([code >> 8, code & 0xFF])
+
+def lines(units, per_line=40, newline=b"\n"):
+    # Breaks the corpus into lines, as text usually is.
+    return newline.join(b"".join(units[i:i + per_line]) for i in range(0, len(units), per_line))
+
+def gbk_pointer(pointer):
+    trail = pointer % 190
+    return bytes([(pointer // 190) + 0x81, trail + (0x40 if trail < 0x3F else 0x41)])
+
+def utf1(ucs):
+    def t(z):
+        return z + 0x21 if z < 0x5E else z + 0x42
+    if ucs < 0xA0:
+        return bytes([ucs])
+    elif ucs < 0x100:
+        return bytes([0xA0, ucs])
+    elif ucs < 0x4016:
+        y = ucs - 0x100
+        return bytes([0xA1 + y // 190, t(y % 190)])
+    elif ucs < 0x38E2E:
+        y = ucs - 0x4016
+        return bytes([0xF6 + y // (190 ** 2), t((y // 190) % 190), t(y % 190)])
+    y = ucs - 0x38E2E
+    return bytes([0xFC + y // (190 ** 4), t((y // 190 ** 3) % 190), t((y // 190 ** 2) % 190),
+                  t((y // 190) % 190), t(y % 190)])
+
+to_utfebcdic = {i8: code for code, i8 in enumerate(utfebcdicfilter.conv_map)}
+def utfebcdic(ucs):
+    if ucs < 0xA0:
+        i8 = [ucs]
+    else:
+        # UTF-8-Mod: five bits per trail byte, lead byte marked with the total length.
+        for length, limit in ((2, 0x400), (3, 0x4000), (4, 0x40000), (5, 0x400000)):
+            if ucs < limit:
+                break
+        i8 = [0xA0 | ((ucs >> (5 * i)) & 0x1F) for i in range(length - 1)][::-1]
+        i8.insert(0, ((0xFF << (8 - length)) & 0xFF) | (ucs >> (5 * (length - 1))))
+    return bytes(to_utfebcdic[i] for i in i8)
+
+def build_corpora():
+    jis = read_mapping("UTC/JIS0208.TXT", 0, 2)
+    # Hangul fillers are left out, since lone ones are errors.
+    ksc = [i for i in read_mapping("UTC/KSC5601.TXT") if i[1] != 0x3164]
+    big5 = read_mapping("UTC/BIG5.TXT")
+    gb2312 = read_mapping("UTC/GB2312.TXT")
+    gb18030 = read_mapping("WHATWG/index-gb18030.txt", pointers=True)
+    euckr = [i for i in read_mapping("WHATWG/index-euc-kr.txt", pointers=True)
+             if i[1] != 0x3164]
+    latin = [i for i in range(0x20, 0x7F)] + [i for i in range(0xA0, 0x100)]
+    # Mixed script text for the Unicode formats: Latin-1, then the JIS X 0208 repertoire (kana,
+    #   Greek, Cyrillic and kanji), the UHC Hangul, and some astral characters besides.
+    unitext = latin + [ucs for code, ucs in jis] + [ucs for code, ucs in ksc[:2000]]
+    unitext += list(range(0x10400, 0x10450)) + list(range(0x20000, 0x20100))
+    def unichars(encoding):
+        return [chr(i).encode(encoding) for i in unitext]
+    corpora = {
+        "utf-8": (b"\x1B%G", lines(unichars("utf-8"))),
+        "utf-16": (b"\x1B%/L", lines(unichars("utf-16be"), newline="\n".encode("utf-16be"))),
+        "utf-32": (b"\x1B%/F", lines(unichars("utf-32be"), newline="\n".encode("utf-32be"))),
+        "utf-1": (b"\x1B%B", lines([utf1(i) for i in unitext])),
+        # Single-byte mode, with the default dynamic window for the upper half (Latin-1).
+        "scsu": (b"\x1B%/5", lines([bytes([i]) for i in latin])),
+        "shift_jis": (b"\x1B%0", lines([dbcs(code) for code, ucs in jis])),
+        "uhc": (b"\x1B%1", lines([dbcs(code) for code, ucs in ksc])),
+        "gbk": (b"\x1B%2", lines([gbk_pointer(pointer) for pointer, ucs in gb18030
+                                  if pointer < 190 * 126] +
+                                 [chr(i).encode("gb18030") for i in range(0x0E01, 0x0E3B)])),
+        "big5": (b"\x1B%4", lines([dbcs(code) for code, ucs in big5])),
+        "ebcdic": (b"\x1B%/6", lines([chr(i).encode("cp500") for i in latin],
+                                     newline="\n".encode("cp500"))),
+        # UTF-EBCDIC is selected by code page (there being no DOCS for it as such).
+        "utf-ebcdic": (b"\x1B[1211*p", lines([utfebcdic(i) for i in unitext],
+                                         newline=utfebcdic(0x0A))),
+        "euc-jp": (b"\x1B$)B", lines([dbcs(code | 0x8080) for code, ucs in
+                                      read_mapping("UTC/JIS0208.TXT", 1, 2)])),
+        "euc-kr": (b"\x1B$)C", lines([dbcs(((pointer // 190) + 0x81) << 8 |
+                                           ((pointer % 190) + 0x41))
+                                      for pointer, ucs in euckr
+                                      if pointer // 190 >= 0x20 and pointer % 190 >= 0x60])),
+        "euc-cn": (b"\x1B$)A", lines([dbcs(code | 0x8080) for code, ucs in gb2312])),
+        "plainextascii": (b"\x1B%3", lines([bytes([i]) for i in latin])),
+    }
+    target = int(megabytes * 1048576)
+    return {name: prefix + body * max(target // len(body), 1)
+            for name, (prefix, body) in corpora.items()}
+
+def count_tokens(stream, state):
+    # Consumes the tokens as they arrive (so they don't count towards the memory used), yielding
+    #   just the total.
+    count = 0
+    for token in stream:
+        count += 1
+    yield count
+
+def run(corpus):
+    return next(tokenfeed.process_stream(io.BytesIO(corpus), lastfilter=count_tokens))
+
+def measure(corpus):
+    start = time.perf_counter()
+    tokens = run(corpus)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run(corpus)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mbps": len(corpus) / 1048576 / elapsed, "tokens_per_s": tokens / elapsed,
+            "peak_kib": peak / 1024}
+
+corpora = build_corpora()
+run(corpora["utf-8"][:1024]) # Loads graphdata
+results = {}
+for name, corpus in corpora.items():
+    results[name] = measure(corpus)
+    print("{:<14} {:8.3f} MB/s {:10.0f} tokens/s {:10.1f} KiB peak".format(name,
+          results[name]["mbps"], results[name]["tokens_per_s"], results[name]["peak_kib"]))
+
+def describe_commit():
+    # The last commit changing the package (with "-dirty" if it has changed since), per git.
+    def git(*args):
+        return subprocess.run(("git",) + args + ("--", ":/ecma35"), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    try:
+        return git("log", "-1", "--format=%h") + ("-dirty" if git("status", "--porcelain") else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if flags.get("update"):
+    taken = {"commit": describe_commit(), "python": platform.python_version(),
+             "megabytes": megabytes}
+    with open(baseline_file, "w", encoding="utf-8") as f:
+        f.write(json.dumps(dict(results, taken=taken), indent=1, sort_keys=True) + "\n")
+    print("Baseline updated.")
+    sys.exit(0)
+
+with open(baseline_file, "r", encoding="utf-8") as f:
+    baseline = json.load(f)
+taken = baseline.pop("taken", {})
+print("Baseline taken at commit {}, with Python {}.".format(taken.get("commit", "unknown"),
+                                                            taken.get("python", "unknown")))
+regressions = []
+for name, result in results.items():
+    if name not in baseline:
+        print("{}: no baseline".format(name))
+        continue
+    if result["mbps"] < baseline[name]["mbps"] * (1 - tolerance):
+        regressions.append("{}: {:.3f} MB/s against {:.3f} MB/s".format(name, result["mbps"],
+                           baseline[name]["mbps"]))
+    if result["peak_kib"] > baseline[name]["peak_kib"] * (1 + tolerance):
+        regressions.append("{}: {:.1f} KiB peak against {:.1f} KiB".format(name,
+                           result["peak_kib"], baseline[name]["peak_kib"]))
+for regression in regressions:
+    print("REGRESSION", regression)
+if regressions:
+    sys.exit(1)
+print("No regressions beyond {:.0%} of baseline.".format(tolerance))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Measures how parallel decoding scales from one worker process up to the number of CPUs (or
+#   the number given), on a file of the test.py corpus repeated, and checks that the tokens match
+#   those from single-process decoding. Also checks the same for some random mixtures of ISO 2022,
+#   UTF-8, UTF-16 and UTF-32 (with and without standard return) and CMD, split into small chunks,
+#   so that many of the splits, and the ends of the windows checking them, are in awkward places.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, time, random, tempfile, concurrent.futures
+from ecma35.decoder import tokenfeed, paralleldecode
+from test import dat
+
+maxworkers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+# The corpus ends in a DOCS without standard return, which would leave no safe split points.
+sample = dat[:dat.rindex(b"\x1B%/B")] + b"\x1B%@\n"
+corpus = sample * repeats
+
+def mixed_piece(rng):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return "日本語のテキスト".encode("iso-2022-jp") * rng.randint(1, 20)
+    elif kind == 1:
+        return b"\x1B%G" + "Grüße €".encode("utf-8") * rng.randint(1, 20) + b"\x1B%@"
+    elif kind == 2:
+        # Without standard return, so any ESC % @ after it is no split point.
+        return b"\x1B%/L" + "ab中".encode("utf-16-be") * rng.randint(1, 20) + (
+               b"\x1B%@"[:rng.randint(1, 3)])
+    elif kind == 3:
+        return b"\x1B%/F" + "ab".encode("utf-32-be") * rng.randint(1, 20)
+    elif kind == 4:
+        return b"\x1B%@" + b"plain text\n" * rng.randint(1, 10)
+    return b"\x1B%G\x1B%@\x1Bd" * rng.randint(1, 3) # CMD, popping back past the ESC % @.
+
+def check_mixed(tempdir, executor, count=40):
+    filename = os.path.join(tempdir, "mixed.bin")
+    for seed in range(count):
+        rng = random.Random(seed)
+        data = b"".join(mixed_piece(rng) for i in range(rng.randint(5, 60)))
+        with open(filename, "wb") as f:
+            f.write(data)
+        try:
+            expected = list(tokenfeed.process_stream(io.BytesIO(data),
+                                                     lastfilter=paralleldecode._passthrough))
+        except Exception:
+            continue # e.g. ending partway through a word of UTF-16, which is no fault of ours.
+        tokens = list(paralleldecode.process_file_parallel(
+                filename, executor=executor, chunksize=rng.choice((16, 64, 256)),
+                window=rng.choice((8, 32, 128))))
+        assert tokens == expected, "token streams differ for mixed input {}".format(seed)
+
+def warm_up():
+    list(tokenfeed.process_stream(io.BytesIO(sample), lastfilter=paralleldecode._passthrough))
+
+with tempfile.TemporaryDirectory() as tempdir:
+    filename = os.path.join(tempdir, "corpus.bin")
+    with open(filename, "wb") as f:
+        f.write(corpus)
+    size = len(corpus) / 1048576
+    print("Corpus: {:.2f} MiB".format(size))
+    warm_up()
+    start = time.perf_counter()
+    expected = list(tokenfeed.process_stream(io.BytesIO(corpus),
+                                             lastfilter=paralleldecode._passthrough))
+    serial = time.perf_counter() - start
+    print("Single process: {:.3f} MB/s".format(size / serial))
+    for workers in range(1, maxworkers + 1):
+        chunksize = max(len(corpus) // (workers * 4), 1)
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            # Load graphdata in every worker before timing.
+            for future in [executor.submit(warm_up) for i in range(workers)]:
+                future.result()
+            start = time.perf_counter()
+            tokens = list(paralleldecode.process_file_parallel(filename, executor=executor,
+                                                               chunksize=chunksize))
+            elapsed = time.perf_counter() - start
+            assert tokens == expected, "token streams differ"
+            check_mixed(tempdir, executor)
+        print("{} worker(s): {:.3f} MB/s, {:.2f}x".format(workers, size / elapsed,
+                                                         serial / elapsed))
+    print("Token streams identical.")
+
+
+
+
+
+
+
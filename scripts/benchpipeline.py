@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Compares the time taken per document by tokenfeed.decode and a reused tokenfeed.Pipeline (with
+#   and without an input profile) on many short documents, of sizes from one byte to one KiB, cut
+#   from some email headers in ISO-2022-JP (so as not to cut into a multi-byte DOCS).
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time
+from ecma35.decoder import tokenfeed
+
+headers = (b"From: \x1B$B;3ED\x1B(B <yamada@example.jp>\r\n"
+           b"Subject: Re: \x1B$B2q5DO?\x1B(B (meeting notes)\r\n"
+           b"Date: Sun, 18 Oct 2026 10:00:00 +0900\r\n")
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+sizes = (1, 16, 64, 256, 1024)
+
+tokenfeed.decode(headers) # Loads graphdata
+
+def documents(size):
+    # Cut at varying offsets.
+    source = headers * (2 + size // len(headers))
+    return [source[(i * 7) % len(headers):(i * 7) % len(headers) + size] for i in range(count)]
+
+def timed(decode, docs):
+    start = time.perf_counter()
+    results = list(decode(docs))
+    return results, (time.perf_counter() - start) / count * 1e6
+
+print("{:>6} {:>10} {:>10} {:>10}".format("Bytes", "decode", "Pipeline", "profiled"))
+for size in sizes:
+    docs = documents(size)
+    expected, plain = timed(lambda docs: [tokenfeed.decode(i) for i in docs], docs)
+    results, reused = timed(tokenfeed.Pipeline().decode_many, docs)
+    assert results == expected, "results differ"
+    # Leaving out the DOCS filters for all but ECMA-35 itself.
+    trimmed = tokenfeed.Pipeline(input_profile=("ecma-35",))
+    timed(trimmed.decode_many, docs[:1]) # Generates the plan
+    results, profiled = timed(trimmed.decode_many, docs)
+    print("{:>6} {:>8.1f}us {:>8.1f}us {:>8.1f}us".format(size, plain, reused, profiled))
+print("Results identical.")
+
+
+
+
+
+
+
+
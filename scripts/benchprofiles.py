@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Compares decoding with each named input profile (see inputprofiles) with decoding the same input
+#   with the full pipeline (with the profile's escape sequences put before it), as to the number
+#   of stages and the time taken, checking that the text is the same.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import timeit, random
+from ecma35.decoder import tokenfeed, inputprofiles
+
+def sample(rng, ranges, encoding, size):
+    # Text of random characters (of those in the encoding) from the ranges, in lines of words.
+    characters = []
+    for first, last in ranges:
+        for i in range(first, last + 1):
+            try:
+                chr(i).encode(encoding)
+            except UnicodeEncodeError:
+                continue
+            characters.append(chr(i))
+    words = ["".join(rng.choices(characters, k=rng.randint(1, 6))) for i in range(size // 6)]
+    return "\n".join(" ".join(words[i:i + 12]) for i in range(0, len(words), 12))
+
+def ecma48_sample(rng, size):
+    # UTF-8 text, some of it underlined or in bold with SGR, and some of it overstruck with BS.
+    text = sample(rng, ((0x61, 0x7A), (0xE0, 0xFF), (0x3B1, 0x3C9)), "utf-8", size).split(" ")
+    for i in range(0, len(text), 7):
+        text[i] = "\x1B[{}m{}\x1B[0m".format(rng.choice((1, 4)), text[i])
+    for i in range(3, len(text), 29):
+        text[i] = "_\b" + text[i]
+    return " ".join(text).encode("utf-8")
+
+rng = random.Random(1)
+corpora = {
+    "iso-2022-jp": sample(rng, ((0x3041, 0x3093), (0x4E00, 0x5FFF)), "iso-2022-jp",
+                          100000).encode("iso-2022-jp"),
+    "euc-kr": sample(rng, ((0xAC00, 0xD7A3),), "euc-kr", 100000).encode("euc-kr"),
+    "gb18030": sample(rng, ((0x4E00, 0x7FFF), (0x20000, 0x200FF)), "gb18030",
+                      100000).encode("gb18030"),
+    "utf-8-with-ecma48": ecma48_sample(rng, 100000),
+}
+
+def passthrough(stream, state):
+    return stream
+
+def stages(**kwargs):
+    state = tokenfeed._make_state(kwargs)
+    return len(tokenfeed._plan_pipeline(state, passthrough, None)[1])
+
+def best(function):
+    return min(timeit.repeat(function, number=1, repeat=5)) * 1000
+
+print("{:<25} {:>8} {:>10} {:>10} {:>10} {:>10} {:>8}".format(
+      "Profile", "Bytes", "Stages", "(full)", "Time", "(full)", "Speedup"))
+for name, data in corpora.items():
+    full_data = inputprofiles.profiles[name]["prefix"] + data
+    for fused in (False, True):
+        text = tokenfeed.decode(data, input_profile=name, fused=fused)
+        assert text == tokenfeed.decode(full_data, fused=fused), "text differs"
+        profiled = best(lambda: tokenfeed.decode(data, input_profile=name, fused=fused))
+        full = best(lambda: tokenfeed.decode(full_data, fused=fused))
+        print("{:<25} {:>8} {:>10} {:>10} {:>8.1f}ms {:>8.1f}ms {:>7.2f}x".format(
+              name + (" (fused)" if fused else ""), len(data),
+              stages(input_profile=name, fused=fused), stages(fused=fused),
+              profiled, full, full / profiled))
+print("Text identical.")
+
+
+
+
+
+
+
+
+
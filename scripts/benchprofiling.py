@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Checks the per-stage times given by profile= (see profiling) against those of the unprofiled
+#   pipeline, on the test.py input (repeated). The latter are worked out by timing the pipeline cut
+#   off after each stage in turn (with its output discarded), each stage's time being the
+#   difference from that of the pipeline cut off before it. Gives both, with the ranks of each
+#   stage by either, the time taken with and without profiling, and the rank correlation.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time, collections
+from ecma35.decoder import tokenfeed, profiling, simpletext
+from test import dat
+
+data = dat * 20
+
+def discard(stream, state):
+    collections.deque(stream, maxlen=0)
+    yield from ()
+
+def best(function, repeat=5):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+lastfilter = simpletext.simple_text_maker("replace")
+state = tokenfeed._make_state({})
+word_runs, stages = tokenfeed._plan_pipeline(state, lastfilter, None)
+
+def cut(count):
+    # The tokeniser and the first count stages, or (past the last) all of them and the lastfilter.
+    def run():
+        state = tokenfeed._make_state({})
+        if count <= len(stages):
+            pipeline = tokenfeed._assemble_pipeline(data, state, discard, word_runs,
+                                                    stages[:count])
+        else:
+            pipeline = tokenfeed._assemble_pipeline(data, state, lastfilter, word_runs, stages)
+        collections.deque(pipeline, maxlen=0)
+    return run
+
+tokenfeed.decode(data) # Loads the mappings
+cumulative = [best(cut(count)) for count in range(len(stages) + 2)]
+# The tokeniser's own time is that of the shortest cut.
+unprofiled = [cumulative[0]] + [max(cumulative[i + 1] - cumulative[i], 0.0)
+                                for i in range(len(stages) + 1)]
+
+profile = profiling.PipelineProfile()
+profiled_time = best(lambda: tokenfeed.decode(data, profile=profile), repeat=1)
+plain_time = best(lambda: tokenfeed.decode(data))
+report = profile.as_dict()
+profiled = [stage["time"] for stage in report["stages"]]
+names = [stage["name"] for stage in report["stages"]]
+assert len(profiled) == len(unprofiled), "stages differ"
+
+def ranks(values):
+    order = sorted(range(len(values)), key=lambda i: -values[i])
+    result = [0] * len(values)
+    for rank, i in enumerate(order):
+        result[i] = rank + 1
+    return result
+
+profiled_ranks, unprofiled_ranks = ranks(profiled), ranks(unprofiled)
+print("{:<44} {:>10} {:>5} {:>10} {:>5}".format("Stage", "Profiled", "Rank", "Unprofiled",
+                                                "Rank"))
+for name, a, ra, b, rb in zip(names, profiled, profiled_ranks, unprofiled, unprofiled_ranks):
+    print("{:<44} {:>8.1f}ms {:>5} {:>8.1f}ms {:>5}".format(name, a * 1000, ra, b * 1000, rb))
+count = len(names)
+spearman = 1 - 6 * sum((ra - rb) ** 2 for ra, rb in zip(profiled_ranks, unprofiled_ranks)) / (
+           count * (count * count - 1))
+print("Decoding took {:.3f} s, or {:.3f} s profiled ({:.2f}x); {:.2f} us per token taken away "
+      "for each wrapper.".format(plain_time, profiled_time, profiled_time / plain_time,
+                                 report["overhead_per_token"] * 1e6))
+print("Rank correlation: {:.2f}; the five costliest stages by either: {}".format(spearman,
+      ", ".join(name.rpartition(".")[2] for name, rank in zip(names, unprofiled_ranks)
+                if rank <= 5 and profiled_ranks[names.index(name)] <= 5) or "none in common"))
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Feeds the test.py input (repeated) to a push-mode Decoder in pieces of various sizes, each handed
+#   over to its worker thread at once (the default), or held back until a block's worth is pending
+#   (with handoff_size), giving the time taken for each, and that of decoding it in one pass with
+#   process_stream for comparison, and checking that the tokens are the same throughout.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time
+from ecma35.decoder import tokenfeed
+from test import dat
+
+data = dat * 20
+
+def passthrough(stream, state):
+    return stream
+
+def push(piece_size, handoff_size):
+    start = time.perf_counter()
+    decoder = tokenfeed.Decoder(handoff_size=handoff_size)
+    tokens = []
+    for offset in range(0, len(data), piece_size):
+        tokens.extend(decoder.feed(data[offset:offset + piece_size]))
+    tokens.extend(decoder.flush())
+    return tokens, time.perf_counter() - start
+
+def pull():
+    start = time.perf_counter()
+    tokens = list(tokenfeed.process_stream(data, lastfilter=passthrough, gl_runs=False))
+    return tokens, time.perf_counter() - start
+
+expected, seconds = min((pull() for i in range(3)), key=lambda result: result[1])
+print("{} bytes; process_stream: {:.3f} s, {:.3f} MB/s".format(len(data), seconds,
+                                                                len(data) / 1e6 / seconds))
+print("{:>8} {:>10} {:>12} {:>12} {:>8}".format("Piece", "Feeds", "Each", "Batched", "Speedup"))
+for piece_size in (1, 4, 16, 256, 4096):
+    results = []
+    for handoff_size in (0, 0x1000):
+        tokens, seconds = min((push(piece_size, handoff_size) for i in range(3)),
+                              key=lambda result: result[1])
+        assert tokens == expected, "tokens differ ({} byte pieces, handoff_size={})".format(
+                                   piece_size, handoff_size)
+        results.append(seconds)
+    print("{:>8} {:>10} {:>10.3f} s {:>10.3f} s {:>7.2f}x".format(
+          piece_size, -(-len(data) // piece_size), results[0], results[1],
+          results[0] / results[1]))
+print("Tokens identical.")
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Compares tokenserial with pickling the list of tokens, as to size and time taken to load, for the
+#   tokens from test.py, the same repeated fifty times, and some Zipf-distributed Japanese text (in
+#   UTF-8 and then ISO-2022-JP), checking that the tokens read back are the same.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, time, timeit, pickle, random
+from ecma35.decoder import tokenfeed, tokenserial
+from test import dat
+
+def zipf_text(size=200000, seed=1):
+    rng = random.Random(seed)
+    kanji = []
+    for i in range(0x4E00, 0x9FA0):
+        try:
+            chr(i).encode("iso-2022-jp")
+        except UnicodeEncodeError:
+            continue
+        kanji.append(chr(i))
+        if len(kanji) == 1500:
+            break
+    vocabulary = [chr(i) for i in range(0x3041, 0x3094)] + kanji + list("、。「」\n")
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    text = "".join(rng.choices(vocabulary, weights, k=size // 3))
+    return (b"\x1B%G" + text.encode("utf-8") + b"\x1B%@" +
+            text[:size // 6].encode("iso-2022-jp"))
+
+def passthrough(stream, state):
+    return stream
+
+def best(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1000
+
+inputs = (("test.py", dat), ("test.py x50", dat * 50), ("Zipf text", zipf_text()))
+
+print("{:<12} {:>7} {:>11} {:>11} {:>10} {:>10} {:>10}".format(
+      "Input", "Tokens", "pickle", "tokenserial", "Load (p)", "Load (t)", "Write (t)"))
+for name, data in inputs:
+    tokens = list(tokenfeed.process_stream(io.BytesIO(data), lastfilter=passthrough))
+    pickled = pickle.dumps(tokens, protocol=pickle.HIGHEST_PROTOCOL)
+    f = io.BytesIO()
+    start = time.perf_counter()
+    tokenserial.dump(tokens, f)
+    written = (time.perf_counter() - start) * 1000
+    serialised = f.getvalue()
+    assert tokenserial.load(io.BytesIO(serialised)) == tokens, "tokens differ"
+    number = max(1, 20000 // len(tokens))
+    pickle_load = best(lambda: pickle.loads(pickled), number)
+    serial_load = best(lambda: tokenserial.load(io.BytesIO(serialised)), number)
+    print("{:<12} {:>7} {:>11} {:>11} {:>8.2f}ms {:>8.2f}ms {:>8.2f}ms".format(
+          name, len(tokens), len(pickled), len(serialised), pickle_load, serial_load, written))
+print("Tokens identical.")
+
+
+
+
+
+
+
+
+
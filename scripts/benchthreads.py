@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Decodes a batch of documents (in several encodings) across 1, 2, 4 and 8 threads, all sharing
+#   the one copy of the data, giving the throughput for each, and checking that the text is the
+#   same as when decoded in one thread. The first pass is made in as many threads as possible
+#   before anything else is decoded, so the mappings are loaded on demand by several threads at
+#   once. On a build with the GIL, the throughput can't scale, but the memory taken by the data is
+#   still only paid for once, rather than once for each worker as with a process pool.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time, random, resource, concurrent.futures
+
+def rss():
+    # Peak resident set size, in megabytes.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+baseline = rss()
+from ecma35.data import graphdata
+from ecma35.decoder import tokenfeed
+from test import dat
+datasize = rss() - baseline
+
+def sample(rng, ranges, encoding, size):
+    characters = []
+    for first, last in ranges:
+        for i in range(first, last + 1):
+            try:
+                chr(i).encode(encoding)
+            except UnicodeEncodeError:
+                continue
+            characters.append(chr(i))
+    return "".join(rng.choice(characters + ["\n", " "]) for i in range(size))
+
+rng = random.Random(1)
+documents = []
+for i in range(8):
+    documents += [
+        dat,
+        sample(rng, ((0x3041, 0x3093), (0x4E00, 0x5FFF)), "iso-2022-jp",
+               5000).encode("iso-2022-jp"),
+        b"\x1B$)C" + sample(rng, ((0xAC00, 0xD7A3),), "euc-kr", 5000).encode("euc-kr"),
+        b"\x1B%2" + sample(rng, ((0x4E00, 0x7FFF),), "gb18030", 5000).encode("gb18030"),
+        b"\x1B%G" + sample(rng, ((0x61, 0x7A), (0x3B1, 0x3C9)), "utf-8", 5000).encode("utf-8"),
+        b"\x1B$)A" + sample(rng, ((0x4E00, 0x7FFF),), "gb2312", 5000).encode("gb2312"),
+    ]
+total = sum(map(len, documents))
+
+def run(threads):
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        texts = list(executor.map(tokenfeed.decode, documents))
+    return texts, time.perf_counter() - start
+
+cold, seconds = run(8)
+expected = [tokenfeed.decode(document) for document in documents]
+assert cold == expected, "text differs when first decoded in several threads"
+
+gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+print("{} documents, {:.2f} MB; {} CPUs; GIL {}; data {:.0f} MB".format(
+      len(documents), total / 1e6, os.cpu_count(), "enabled" if gil else "disabled", datasize))
+print("First pass (8 threads, loading the mappings): {:.2f} s".format(seconds))
+print("{:>8} {:>10} {:>10} {:>8} {:>10}".format("Threads", "Seconds", "MB/s", "Scaling",
+                                                 "Peak MB"))
+single = None
+for threads in (1, 2, 4, 8):
+    texts, seconds = min((run(threads) for i in range(3)), key=lambda result: result[1])
+    assert texts == expected, "text differs in {} threads".format(threads)
+    single = single or seconds
+    print("{:>8} {:>10.2f} {:>10.3f} {:>7.2f}x {:>10.0f}".format(
+          threads, seconds, total / 1e6 / seconds, single / seconds, rss()))
+print("Text identical.")
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+# Compares the throughput of the block-buffered tokeniser against the former one-read-per-word
+#   tokeniser, both on its own and driving the full decoder, and checks that the token streams
+#   are identical.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, struct, time
+from ecma35.decoder import tokenfeed
+
+def unbuffered_tokenise_stream(stream, state, word_runs=None):
+    state.bytewidth = 1
+    state.feedback = [("DOCS", False, (0x40,))]
+    state.endian = state.default_endian
+    assert state.endian in "<>"
+    while 1:
+        yield from iter(state.feedback)
+        del state.feedback[:]
+        structmode = state.endian + [..., "B", "H", ..., "L"][state.bytewidth]
+        code = stream.read(state.bytewidth)
+        if not code:
+            break
+        code, = struct.unpack(structmode, code)
+        yield ("WORD", code)
+    yield ("ENDSTREAM",)
+
+sample = ("Our benefactor knows his high calling and will be true to it. " * 4).encode("ascii")
+sample += b"\x1b%G" + "Наш благодетель знает своё высокое призвание. ".encode("utf-8")
+sample += b"\x1b%/L" + "かFoo侅ら¥염盐塩鹽䝼/丽/〒".encode("utf-16be") + b"\x00\x1b\x00%\x00@"
+sample += b"\x1b$)A\x0e" + "盐".encode("gb2312") + b"\x0f\n"
+megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+corpus = sample * int((megabytes * 1048576) // len(sample))
+
+def bench_tokeniser(fn):
+    state = tokenfeed._make_state({})
+    start = time.perf_counter()
+    for token in fn(io.BytesIO(corpus), state):
+        pass
+    return time.perf_counter() - start
+
+def bench_pipeline(fn):
+    tokenfeed._tokenise_stream = fn
+    try:
+        start = time.perf_counter()
+        out = list(tokenfeed.process_stream(io.BytesIO(corpus), lastfilter=lambda stream, state: stream))
+        return time.perf_counter() - start, out
+    finally:
+        tokenfeed._tokenise_stream = buffered_tokenise_stream
+
+buffered_tokenise_stream = tokenfeed._tokenise_stream
+list(tokenfeed.process_stream(io.BytesIO(sample), lastfilter=lambda stream, state: stream)) # Loads graphdata
+
+size = len(corpus) / 1048576
+print("Corpus: {:.2f} MiB".format(size))
+for label, fn in (("unbuffered", unbuffered_tokenise_stream), ("buffered", buffered_tokenise_stream)):
+    print("Tokeniser only, {}: {:.2f} MB/s".format(label, size / bench_tokeniser(fn)))
+elapsed_unbuffered, out_unbuffered = bench_pipeline(unbuffered_tokenise_stream)
+elapsed_buffered, out_buffered = bench_pipeline(buffered_tokenise_stream)
+print("Full decoder, unbuffered: {:.2f} MB/s".format(size / elapsed_unbuffered))
+print("Full decoder, buffered: {:.2f} MB/s".format(size / elapsed_buffered))
+assert out_unbuffered == out_buffered, "token streams differ"
+print("Token streams identical.")
+
+
+
+
+
+
+
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Compares token representations on the test.py input (repeated), as to the memory allocated for
+#   each token and the time taken to dispatch on its type: the tuples which the filters pass today
+#   (the type being an interned string), tuples with an integer opcode in place of the type (the
+#   same as a namedtuple, which is a tuple), objects of a __slots__ class holding an opcode and the
+#   other fields, and tuples whose type is a string subclass carrying an opcode (which the filters
+#   could take as it is, still comparing it against string literals). The tokens are those passed
+#   into each stage of the pipeline, recorded in a first pass. Also gives the throughput of the
+#   pipeline, and the time which an adapter converting its output to opcodes and back (the cost of
+#   keeping the tuples for compatibility) would add to it, checking that the conversions round-trip.
+#
+#   The dispatch is timed (with timeit, so without garbage collection) over a number of rounds,
+#   given as the first argument (default 25), each timing a pass over the tokens in every form in
+#   turn, so that the machine getting faster or slower partway affects them alike. Each form is
+#   given as the median time per token, and as the ratio of its time to that of the tuples in the
+#   same round, median and range, which is what the forms should be judged by: a form is only
+#   faster or slower than the tuples if its range of ratios is wholly below or above one.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import timeit, statistics, tracemalloc, collections
+from ecma35.decoder import tokenfeed
+from test import dat
+
+data = dat * 20
+rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+
+def discard(stream, state):
+    collections.deque(stream, maxlen=0)
+    yield from ()
+
+def record():
+    # The tokens passed into each stage after the tokeniser, and into the lastfilter.
+    tokens = []
+    def tap(stream, state):
+        for token in stream:
+            tokens.append(token)
+            yield token
+    state = tokenfeed._make_state({})
+    word_runs, stages = tokenfeed._plan_pipeline(state, discard, None)
+    tapped = [g for f in stages for g in (tap, f)] + [tap]
+    collections.deque(tokenfeed._assemble_pipeline(data, state, discard, word_runs, tapped),
+                      maxlen=0)
+    return tokens
+
+tokenfeed.decode(data) # Loads the mappings
+tokens = record()
+names = sorted({token[0] for token in tokens})
+opcodes = {name: opcode for opcode, name in enumerate(names)}
+
+class SlotsToken(object):
+    __slots__ = ("opcode", "fields")
+    def __init__(self, opcode, fields):
+        self.opcode = opcode
+        self.fields = fields
+    #
+#
+
+class OpcodeStr(str):
+    # Can't have __slots__, being a str subclass, so the opcode goes in an instance dictionary.
+    pass
+
+typed = {}
+for name in names:
+    typed[name] = OpcodeStr(name)
+    typed[name].opcode = opcodes[name]
+
+representations = {
+    "tuple": lambda token: (token[0],) + token[1:],
+    "opcode tuple": lambda token: (opcodes[token[0]],) + token[1:],
+    "slots": lambda token: SlotsToken(opcodes[token[0]], token[1:]),
+    "opcode str": lambda token: (typed[token[0]],) + token[1:]}
+
+def allocated(convert):
+    # Bytes allocated for each token converted (besides the fields, which are shared).
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        converted = [convert(token) for token in tokens]
+        return (tracemalloc.get_traced_memory()[0] - before) / len(converted) - 8 # The list.
+    finally:
+        tracemalloc.stop()
+
+# The dispatch done by a typical filter, comparing the type against the commonest few types. Each
+# is compiled with the opcodes written in as literals, as a filter written for them would have them
+# (an enum's members would need a global and an attribute lookup besides), so as to give them the
+# best case, and with the comparisons the same for every form.
+_dispatch_template = """
+def dispatch(converted):
+    count = 0
+    for token in converted:
+        if {kind} == {CHAR}:
+            count += 1
+        elif {kind} in ({CTRL}, {WORD}):
+            count += 2
+        elif {kind} == {CHARS}:
+            count += 3
+    return count
+"""
+
+def compile_dispatch(kind, literal):
+    namespace = {}
+    exec(_dispatch_template.format(kind=kind, **{name: literal(name) for name in
+                                                 ("CHAR", "CHARS", "CTRL", "WORD")}), namespace)
+    return namespace["dispatch"]
+
+dispatch_str = compile_dispatch("token[0]", repr)
+dispatch_opcode = compile_dispatch("token[0]", lambda name: opcodes.get(name, -1))
+dispatch_slots = compile_dispatch("token.opcode", lambda name: opcodes.get(name, -1))
+
+dispatchers = {"tuple": dispatch_str, "opcode tuple": dispatch_opcode, "slots": dispatch_slots,
+               "opcode str": dispatch_str}
+
+print("{} bytes of input; {} tokens passed between stages ({:.1f} per byte), of {} types.".format(
+      len(data), len(tokens), len(tokens) / len(data), len(names)))
+expected = dispatch_str(tokens)
+timers = {}
+for name, convert in representations.items():
+    converted = [convert(token) for token in tokens]
+    assert dispatchers[name](converted) == expected, name
+    timers[name] = timeit.Timer(lambda dispatch=dispatchers[name], converted=converted:
+                                dispatch(converted))
+times = {name: [] for name in timers}
+for i in range(rounds):
+    for name, timer in timers.items():
+        times[name].append(timer.timeit(number=1))
+print("{:<14} {:>12} {:>12} {:>24}".format("Tokens", "Bytes/token", "Dispatch", "Ratio to tuple"))
+for name, convert in representations.items():
+    ratios = [a / b for a, b in zip(times[name], times["tuple"])]
+    print("{:<14} {:>12.1f} {:>10.1f}ns {:>8.2f} ({:.2f} to {:.2f})".format(
+          name, allocated(convert), statistics.median(times[name]) / len(tokens) * 1e9,
+          statistics.median(ratios), min(ratios), max(ratios)))
+
+def to_opcodes(stream, state):
+    for token in stream:
+        yield (opcodes[token[0]],) + token[1:]
+
+def from_opcodes(stream, state):
+    for token in stream:
+        yield (names[token[0]],) + token[1:]
+
+def passthrough(stream, state):
+    return stream
+
+def round_trip(output):
+    return collections.deque(from_opcodes(to_opcodes(iter(output), None), None), maxlen=0)
+
+output = list(tokenfeed.process_stream(data, lastfilter=passthrough))
+assert list(from_opcodes(to_opcodes(iter(output), None), None)) == output, "adapter differs"
+plain_timer = timeit.Timer(lambda: collections.deque(
+                           tokenfeed.process_stream(data, lastfilter=discard), maxlen=0))
+adapter_timer = timeit.Timer(lambda: round_trip(output))
+plain, adapter = [], []
+for i in range(max(rounds // 5, 3)):
+    plain.append(plain_timer.timeit(number=1))
+    adapter.append(adapter_timer.timeit(number=1))
+shares = [a / b * 100 for a, b in zip(adapter, plain)]
+print("Pipeline: {:.3f} MB/s; the adapter at the end would add {:.1f} ms to its {:.1f} ms "
+      "({:.1f}%, {:.1f}% to {:.1f}%).".format(
+      len(data) / 1e6 / statistics.median(plain), statistics.median(adapter) * 1000,
+      statistics.median(plain) * 1000, statistics.median(shares), min(shares), max(shares)))
+print("Round trip through opcodes identical.")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Checks that long, terminated control strings (an OSC 52 clipboard string and a sixel DCS) decode
+#   to a single CTRLSTRING by default, and that the caps on control strings, prefixed diacritics
+#   and overstrikes only apply when given, giving the expected ERRORs for an overlong run and
+#   leaving the text after it intact.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import base64
+from ecma35.decoder import tokenfeed
+
+def passthrough(stream, state):
+    return stream
+
+def tokens(data, **kwargs):
+    return [token for token in tokenfeed.process_stream(data, lastfilter=passthrough, **kwargs)
+            if token[0] in ("CTRLSTRING", "ERROR")]
+
+osc52 = b"\x1B]52;c;" + base64.b64encode(bytes(range(256)) * 235)[:80000] + b"\x1B\\"
+sixel = b"\x1BPq" + b"#0;2;0;0;0#0" + b"~-" * 50000 + b"\x1B\\"
+
+for name, data in (("OSC", osc52), ("DCS", sixel)):
+    result = tokens(data)
+    assert [token[:2] for token in result] == [("CTRLSTRING", name)], result[:3]
+    # The introducer, each byte of the string itself, and the ST.
+    assert len(result[0][2]) == len(data) - 2, len(result[0][2])
+    capped = tokens(data, ctrlstring_cap=0x100)
+    assert [token[:2] for token in capped] == [("ERROR", "CTRLSTRINGCAP")], capped[:3]
+
+def output(data, **kwargs):
+    return [token for token in tokenfeed.process_stream(data, lastfilter=passthrough, **kwargs)
+            if token[0] in ("CHAR", "COMPCHAR", "CTRL", "ERROR")]
+
+# A backspace after each of 2000 letters: each time the stack of them passes the cap, an ERROR with
+#   the 33 letters and 33 backspaces so far, then the last 20 of each and the "b" overstruck.
+overstrikes = b"a\x08" * 2000 + b"b tail"
+result = output(overstrikes, overstrike_cap=0x40)
+assert [token[:2] for token in result[:60]] == [("ERROR", "OVERSTRIKECAP")] * 60, result[:3]
+assert all(len(token[2]) == 66 for token in result[:60])
+assert [token[0] for token in result[60:]] == ["COMPCHAR", "CTRL"] + ["CHAR"] * 4, result[60:]
+assert result[60][1] == (97, 8) * 20 + (98,), result[60][1]
+assert "".join(chr(token[1]) for token in result[62:]) == "tail", result[62:]
+assert [token for token in output(overstrikes) if token[0] == "ERROR"] == []
+
+# T.61 (ir103) into G1, invoked over GR, and 2000 of its prefixed grave accents before "abc": an
+#   ERROR with 65 of them each time the cap is passed, then the last 50 with the "a" they go on.
+diacritics = b"\x1B)v" + b"\xC1" * 2000 + b"abc"
+result = output(diacritics, diacritic_cap=0x40)
+assert [token[:2] for token in result[:30]] == [("ERROR", "DIACRITICCAP")] * 30, result[:3]
+assert all(len(token[2]) == 65 and token[2][0][1] == -0x300 for token in result[:30])
+assert [token[0] for token in result[30:]] == ["COMPCHAR", "CHAR", "CHAR"], result[30:]
+assert result[30][1] == (0x61,) + (0x300,) * 50, result[30][1][:3]
+assert "".join(chr(token[1]) for token in result[31:]) == "bc", result[31:]
+assert [token for token in output(diacritics) if token[0] == "ERROR"] == []
+
+state = tokenfeed._make_state({})
+assert state.ctrlstring_cap is state.diacritic_cap is state.overstrike_cap is None
+
+print("Cap checks passed.")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Checks checkpointindex on random mixtures of ISO 2022 (ISO-2022-JP and ISO-2022-KR, the latter
+#   with its SO and SI) and UTF-16 (of either byte order, with and without byte order marks, with
+#   isolated surrogates, and returning to ECMA-35 by an ESC % @ in UTF-16), with checkpoints due
+#   every few lines: building the index mustn't fail, and seeking to each checkpoint must give the
+#   same tokens as the full pass gives from there on.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import random, tempfile
+from ecma35.decoder import tokenfeed, checkpointindex
+
+def passthrough(stream, state):
+    return stream
+
+def utf16(rng):
+    codec = rng.choice(("utf-16-be", "utf-16-le"))
+    # Including isolated surrogates, and byte order marks (or their swapped counterparts) partway
+    # through, which the filter handles using what it recorded at the start of the DOCS.
+    text = "".join(rng.choice(("a", "b", "中", "文", "\n", "\n\uDC00", "\n\uFFFE", "\n\uFEFF"))
+                   for i in range(rng.randint(1, 60)))
+    bom = "\uFEFF" if codec.endswith("le") or rng.random() < 0.5 else ""
+    return b"\x1B%/L" + (bom + text + "\x1B%@").encode(codec, "surrogatepass")
+
+def iso2022(rng):
+    if rng.random() < 0.5:
+        text = "".join(rng.choice("日本語テキスト\n") for i in range(rng.randint(1, 60)))
+        return text.encode("iso-2022-jp")
+    text = "".join(rng.choice("한국어\n ") for i in range(rng.randint(1, 60)))
+    return b"\x1B$)C" + text.encode("iso-2022-kr")[4:]
+
+def mixed(seed):
+    rng = random.Random(seed)
+    return b"".join(rng.choice((utf16, iso2022))(rng) for i in range(rng.randint(10, 80)))
+
+with tempfile.TemporaryDirectory() as tempdir:
+    filename = os.path.join(tempdir, "mixed.bin")
+    checked = 0
+    for seed in range(50):
+        data = mixed(seed)
+        with open(filename, "wb") as f:
+            f.write(data)
+        expected = list(tokenfeed.process_stream(data, lastfilter=passthrough))
+        checkpoints = checkpointindex.build_index(filename, interval=64, window=32, sidecar=False)
+        with open(filename, "rb") as f:
+            for checkpoint in checkpoints:
+                start, count, tokens = checkpointindex.seek(f, checkpoint[0], checkpoints,
+                                                             lastfilter=passthrough)
+                assert list(tokens) == expected[count:], (seed, start)
+                checked += 1
+    print("{} checkpoints checked.".format(checked))
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Checks the prefixes which python -m ecma35 builds from --docs and --designate: decoding them
+#   (with an IRR where the set is a variant) gives no ERROR tokens in any DOCS which takes
+#   designations, and --designate is refused with a DOCS which doesn't, including one reached
+#   through --profile.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, contextlib
+from ecma35 import __main__ as cli
+from ecma35.decoder import tokenfeed
+
+def passthrough(stream, state):
+    return stream
+
+designations = ("G1=ir087", "G1=ir168", "G2=ir042", "G3=ir159", "G1=ir100", "C1=ir077")
+for docs in (None,) + cli._designating_docs:
+    prefix = b"".join(([cli.docs_sequence(docs)] if docs else []) +
+                      [cli.designation_sequence(i) for i in designations])
+    errors = [token for token in tokenfeed.process_stream(prefix, lastfilter=passthrough)
+              if token[0] == "ERROR"]
+    assert not errors, (docs, errors)
+assert cli.designation_sequence("G1=ir168").startswith(b"\x1B&") # i.e. with an IRR
+
+def refused(argv):
+    with contextlib.redirect_stderr(io.StringIO()) as stderr:
+        try:
+            cli.main(argv)
+        except SystemExit as exit:
+            return exit.code == 2 and "not interpreted" in stderr.getvalue()
+    return False
+
+for docs in ("utf-8", "utf-1", "utf-16", "utf-32", "raw", "scsu", "ebcdic"):
+    assert refused(["--docs", docs, "--designate", "G1=ir087", os.devnull]), docs
+assert refused(["--profile", "utf-8-with-ecma48", "--designate", "G1=ir087", os.devnull])
+assert cli.initial_docs(None, "gb18030") == "gbk"
+assert cli.initial_docs(None, "euc-kr") == cli.initial_docs(None, None) == "ecma-35"
+
+print("CLI prefix checks passed.")
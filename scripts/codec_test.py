@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Checks the ECMA-35 codecs (see ecma35codec) with io.TextIOWrapper and open, over both read-only
+#   and writable buffers (the latter needing an IncrementalEncoder, even when only read from), and
+#   that writing text gives a UnicodeEncodeError rather than anything less clear; also the presets
+#   setting the byte order for UTF-16 and UTF-32.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import io, tempfile
+from ecma35.decoder import ecma35codec
+
+data = "あいう\n日本語\n".encode("shift_jis")
+expected = "あいう\n日本語\n"
+
+assert data.decode("ecma35-shift_jis") == expected
+assert io.TextIOWrapper(io.BytesIO(b"\x82\xa0"), encoding="ecma35-shift_jis").read() == "あ"
+wrapper = io.TextIOWrapper(io.BytesIO(data), encoding="ecma35-shift_jis", newline="")
+assert wrapper.readline() == "あいう\n"
+assert wrapper.read() == "日本語\n"
+assert "".encode("ecma35") == b""
+
+# The UTF-16 and UTF-32 presets, in either byte order, and a UTF-16 byte order mark overriding it.
+for preset in ("utf_16_be", "utf_16_le", "utf_32_be", "utf_32_le"):
+    encoded = expected.encode(preset)
+    assert encoded.decode("ecma35-" + preset) == expected, preset
+    wrapper = io.TextIOWrapper(io.BytesIO(encoded * 1000), encoding="ecma35-" + preset,
+                               newline="")
+    assert wrapper.read() == expected * 1000, preset
+assert ("\uFEFF" + expected).encode("utf-16-le").decode("ecma35-utf_16_be") == expected
+
+# Error handlers besides replace and ignore are given the bytes which the error stands for, so
+# backslashreplace and surrogateescape keep them; where they aren't known, U+FFFD is given instead.
+assert b"\xb0".decode("ecma35-euc_kr", "backslashreplace") == "\\xb0"
+assert b"a\xffb".decode("ecma35-euc_kr", "backslashreplace") == "a\\xffb"
+assert b"a\xff\xc3b".decode("ecma35-utf_8", "surrogateescape") == "a\udcff\udcc3b"
+assert b"\xa4 ".decode("ecma35-big5", "backslashreplace") == "\\xa4 "
+assert b"\x1B$".decode("ecma35", "backslashreplace") == "\uFFFD"
+wrapper = io.TextIOWrapper(io.BytesIO(b"ab\xb0"), encoding="ecma35-euc_kr",
+                           errors="backslashreplace")
+assert wrapper.read() == "ab\\xb0"
+for undecodable in (b"\xb0", b"\x1B$"):
+    try:
+        undecodable.decode("ecma35-euc_kr")
+    except UnicodeDecodeError as error:
+        assert "--1" not in str(error), error
+    else:
+        assert False, undecodable
+
+def refuses(write):
+    try:
+        write()
+    except UnicodeEncodeError as error:
+        assert "only decode" in str(error), error
+        return True
+    return False
+
+assert refuses(lambda: "あ".encode("ecma35-shift_jis"))
+wrapper = io.TextIOWrapper(io.BytesIO(), encoding="ecma35")
+assert refuses(lambda: (wrapper.write("abc"), wrapper.flush()))
+
+with tempfile.TemporaryDirectory() as tempdir:
+    filename = os.path.join(tempdir, "sjis.txt")
+    with open(filename, "wb") as f:
+        f.write(data)
+    with open(filename, "r", encoding="ecma35-shift_jis", newline="") as f:
+        assert f.read() == expected
+    with open(filename, "r+", encoding="ecma35-shift_jis", newline="") as f:
+        assert f.read() == expected
+        assert refuses(lambda: (f.write("x"), f.flush()))
+    with open(filename, "rb") as f:
+        assert f.read() == data # Nothing was written.
+
+print("Codec checks passed.")
+
+
+
+
+
+
+
+
+
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8 -*-
+# By HarJIT in 2026.
+
+# Fuzzes the decoder for input taking it more than linear time or memory: inputs are made from the
+#   test.py input by mutating it with escape sequences (for every DOCS, and every set in the
+#   mapping tables, in every working set), control strings, CSI and GCC sequences and so forth,
+#   splices, and runs of the same repeated many times over. The time taken to decode each input
+#   (with a fresh pipeline) and the peak memory allocated meanwhile (per tracemalloc, in a second
+#   run) are checked against a bound of the form base + per_byte * length; the time per byte is
+#   calibrated from the test.py input itself. Any input exceeding either (on being decoded again,
+#   lest a one-off pause or the loading of data on first use be taken for it) is minimised, and
+#   saved to fuzzcases, which --replay checks again, as regression cases. Exits with status 1 if
+#   any input exceeded a bound.
+#
+#   With --exceptions, inputs making the decoder raise an exception are treated the same way;
+#   otherwise, they are only counted. With --log, the figures for every input are written to a
+#   file, as lines of JSON.
+
+import sys, os
+sys.path.append(os.path.abspath(os.pardir))
+
+import time, random, hashlib, argparse, tracemalloc, collections, json
+from ecma35.decoder import tokenfeed, docssequences
+from ecma35.data import graphdata, controldata
+from test import dat
+
+casedir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fuzzcases")
+_wsetbytes = {"94": b"()*+", "96": b"-./"}
+
+def make_dictionary():
+    # Sequences to insert, each as it would be written.
+    words = [b"\x1B%" + (b"/" if token[1] else b"") + bytes(token[2])
+             for token in docssequences.docs_tokens.values()]
+    words += [b"\x1B%/@", b"\x1B%/C", b"\x1B%/F", b"\x1B%/H", b"\x1B%/I"]
+    for settype, table in graphdata.sumps.items():
+        multibyte = b"$" if settype.endswith("n") else b""
+        for idbytes in table:
+            for wsetbyte in _wsetbytes[settype.rstrip("n")]:
+                words.append(b"\x1B" + multibyte + bytes((wsetbyte,)) + bytes(idbytes))
+    words += [b"\x1B!" + bytes(idbytes) for idbytes in controldata.c0bytes]
+    words += [b"\x1B\"" + bytes(idbytes) for idbytes in controldata.c1bytes]
+    words += [b"\x1B[" + codepage.encode("ascii") + b"*p" for codepage in graphdata.chcpdocs]
+    words += [b"\x0E", b"\x0F", b"\x1BN", b"\x1BO", b"\x8E", b"\x8F", b"\x1Bn", b"\x1Bo", b"\x1B~",
+              b"\x1B}", b"\x1B|", b"\x1B&@", b"\x1B[", b"\x9B", b"1;", b"\x1B]", b"\x9D", b"\x1BP",
+              b"\x1B_", b"\x1BX", b"\x1B^", b"\x1B\\", b"\x9C", b"\x07", b"\x08", b"_\x08",
+              b"\x1B[0 _", b"\x1B[1 _", b"\x1B[2 _", b"\x1B[m", b"\x1B[38;5;1m", b"\x1B[A",
+              b"\xEF\xBB\xBF", b"\xFE\xFF", b"\xFF\xFE", b"\xED\xA0\x80", b"\xA4\xD4", b"\xC2\x80",
+              b"\x1BK", b"\x1BL", b"\x1C", b"\x1B\x1B", b"\x00", b"\x7F", b"\xFF"]
+    return words
+
+def make_seeds():
+    # The test.py input, and pieces of it.
+    seeds = [dat]
+    for start in range(0, len(dat), 0x100):
+        seeds.append(dat[start:start + 0x200])
+    return seeds
+
+def mutate(rng, data, dictionary, seeds, max_size):
+    data = bytearray(data)
+    for i in range(rng.randint(1, 4)):
+        choice = rng.randrange(7)
+        position = rng.randint(0, len(data))
+        if choice == 0:
+            data[position:position] = rng.choice(dictionary)
+        elif choice == 1 and data:
+            data[rng.randrange(len(data))] = rng.randrange(0x100)
+        elif choice == 2:
+            # A run of bytes from the GL or GR range, as of characters in a designated set.
+            low = rng.choice((0x21, 0xA1))
+            data[position:position] = bytes(rng.randint(low, low + 0x5D)
+                                            for i in range(rng.randint(1, 64)))
+        elif choice == 3:
+            del data[position:position + rng.randint(1, 64)]
+        elif choice == 4:
+            data[position:position] = data[position:position + rng.randint(1, 64)]
+        elif choice == 5:
+            seed = rng.choice(seeds)
+            start = rng.randint(0, len(seed))
+            data[position:position] = seed[start:start + rng.randint(1, 0x400)]
+        else:
+            # The same thing many times over, which is what shows up superlinear behaviour.
+            if rng.random() < 0.6 or not data:
+                piece = rng.choice(dictionary)
+            else:
+                piece = data[position:position + rng.randint(1, 32)] or rng.choice(dictionary)
+            data[position:position] = piece * (1 << rng.randint(4, 12))
+    return bytes(data[:max_size])
+
+def discard(stream, state):
+    collections.deque(stream, maxlen=0)
+    yield from ()
+
+def decode(data, options):
+    collections.deque(tokenfeed.process_stream(data, lastfilter=discard, **options), maxlen=0)
+
+def measure(data, options):
+    # The seconds taken and peak bytes allocated, in separate runs since tracing slows things.
+    start = time.perf_counter()
+    decode(data, options)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        decode(data, options)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+class Bounds(object):
+    def __init__(self, seconds_base, seconds_per_byte, memory_base, memory_per_byte):
+        self.seconds_base, self.seconds_per_byte = seconds_base, seconds_per_byte
+        self.memory_base, self.memory_per_byte = memory_base, memory_per_byte
+    #
+    def exceeded(self, data, seconds, peak):
+        # Which bound, if any, the figures for the data exceed.
+        if seconds > self.seconds_base + self.seconds_per_byte * len(data):
+            return "time"
+        elif peak > self.memory_base + self.memory_per_byte * len(data):
+            return "memory"
+        return None
+    #
+    def scaled(self, factor):
+        return Bounds(self.seconds_base * factor, self.seconds_per_byte * factor,
+                      self.memory_base * factor, self.memory_per_byte * factor)
+    #
+#
+
+def check(data, options, bounds, exceptions, confirm=True):
+    # The kind of failure, if any, with the figures (seconds, peak), or None if there are none.
+    try:
+        figures = measure(data, options)
+        kind = bounds.exceeded(data, *figures)
+        if kind and confirm:
+            # Taking the lesser figures from several runs.
+            figures = tuple(map(min, zip(figures, *[measure(data, options) for i in range(2)])))
+            kind = bounds.exceeded(data, *figures)
+    except Exception as error:
+        return ("exception-" + type(error).__name__ if exceptions else None), None
+    return kind, figures
+
+def minimise(data, fails, budget=300):
+    # Removes pieces of the input, halving their size each time no more can be removed, so long as
+    # it still fails in the same way, up to the budget of tries.
+    size = len(data) // 2
+    while size and budget:
+        position = 0
+        while position < len(data) and budget:
+            candidate = data[:position] + data[position + size:]
+            budget -= 1
+            if candidate and fails(candidate):
+                data = candidate
+            else:
+                position += size
+        size //= 2
+    return data
+
+def save_case(kind, data):
+    os.makedirs(casedir, exist_ok=True)
+    filename = os.path.join(casedir, "{}-{}.bin".format(kind, hashlib.sha1(data).hexdigest()[:12]))
+    with open(filename, "wb") as f:
+        f.write(data)
+    return filename
+
+def calibrate(options, size=0x10000):
+    # Seconds per byte for decoding the test.py input, repeated to the given size (the lesser of
+    # several runs, after one to load the data).
+    data = (dat * (size // len(dat) + 1))[:size]
+    decode(data, options)
+    return min(measure(data, options)[0] for i in range(3)) / len(data)
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Fuzzes the decoder for superlinear time or "
+                                                 "memory use.")
+    parser.add_argument("--iterations", type=int, default=200, help="inputs to try")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--max-size", type=int, default=0x10000, help="largest input, in bytes")
+    parser.add_argument("--time-factor", type=float, default=20.0,
+                        help="most time per byte, as a multiple of that for the test.py input")
+    parser.add_argument("--time-base", type=float, default=0.1,
+                        help="seconds allowed besides the time per byte")
+    parser.add_argument("--memory-per-byte", type=float, default=256.0,
+                        help="most peak memory per byte of input")
+    parser.add_argument("--memory-base", type=int, default=0x400000,
+                        help="bytes of memory allowed besides the memory per byte")
+    parser.add_argument("--options", type=json.loads, default={},
+                        help="options for process_stream, as a JSON object")
+    parser.add_argument("--exceptions", action="store_true",
+                        help="treat inputs raising an exception as failing")
+    parser.add_argument("--log", help="file to write the figures for each input to")
+    parser.add_argument("--replay", action="store_true",
+                        help="only check the saved cases again")
+    return parser
+
+def replay(options, bounds, exceptions):
+    failed = 0
+    for filename in sorted(os.listdir(casedir)) if os.path.isdir(casedir) else ():
+        with open(os.path.join(casedir, filename), "rb") as f:
+            data = f.read()
+        kind, figures = check(data, options, bounds, exceptions)
+        failed += bool(kind)
+        print("{}: {}".format(filename, kind or "ok"))
+    return 1 if failed else 0
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    options = args.options
+    per_byte = calibrate(options)
+    bounds = Bounds(args.time_base, per_byte * args.time_factor, args.memory_base,
+                    args.memory_per_byte)
+    print("Calibrated at {:.2f} us per byte; bounds of {:.2f} s + {:.2f} us per byte, and "
+          "{:.1f} MB + {:.0f} bytes per byte.".format(per_byte * 1e6, bounds.seconds_base,
+          bounds.seconds_per_byte * 1e6, bounds.memory_base / 1e6, bounds.memory_per_byte))
+    if args.replay:
+        return replay(options, bounds, args.exceptions)
+    rng = random.Random(args.seed)
+    dictionary, seeds = make_dictionary(), make_seeds()
+    log = open(args.log, "w") if args.log else None
+    worst_seconds = worst_memory = 0
+    raised, failures = collections.Counter(), []
+    try:
+        for iteration in range(args.iterations):
+            data = mutate(rng, rng.choice(seeds), dictionary, seeds, args.max_size)
+            kind, figures = check(data, options, bounds, True, confirm=False)
+            if log:
+                log.write(json.dumps({"iteration": iteration, "bytes": len(data),
+                                      "seconds": figures and figures[0],
+                                      "peak": figures and figures[1], "exception": kind
+                                      if figures is None else None}) + "\n")
+            if figures is None:
+                raised[kind] += 1
+                if not args.exceptions:
+                    continue
+            else:
+                worst_seconds = max(worst_seconds, figures[0] / len(data) if data else 0)
+                worst_memory = max(worst_memory, figures[1] / len(data) if data else 0)
+                if kind:
+                    kind, figures = check(data, options, bounds, args.exceptions)
+            if kind:
+                # Minimised against looser bounds where it exceeds those too, so it isn't left so
+                # close to the bounds that it passes when run again.
+                looser = bounds.scaled(1.25)
+                if check(data, options, looser, args.exceptions)[0] != kind:
+                    looser = bounds
+                data = minimise(data, lambda candidate: check(
+                                candidate, options, looser, args.exceptions)[0] == kind)
+                filename = save_case(kind, data)
+                failures.append(filename)
+                print("{}: {} bytes, saved to {}".format(kind, len(data), filename), flush=True)
+            elif len(seeds) < 1000 and rng.random() < 0.1:
+                seeds.append(data)
+    finally:
+        if log:
+            log.close()
+    print("{} inputs; worst {:.2f} us and {:.0f} bytes of memory per byte; {} failing".format(
+          args.iterations, worst_seconds * 1e6, worst_memory, len(failures)))
+    if raised:
+        print("Exceptions: {}".format(", ".join("{} {}".format(kind[10:], count)
+                                                 for kind, count in sorted(raised.items()))))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+
+
+
+
+
+
+
+
@@ -106,20 +106,21 @@ dat = (b"\x1B[m\x1B%G\x1B!F" + teststr.encode("utf-8-sig") + "\x1CJ염盐塩鹽\
        b"\x1B%/B\x1B%@HAHA_AS_IF\xA1" # i.e. the last DOCS @ should not switch back.
 )
 
-x = io.BytesIO(dat)
+if __name__ == "__main__":
+    x = io.BytesIO(dat)
 
-print(end = "\x1Bc")
+    print(end = "\x1Bc")
 
-x = tokenfeed.process_stream(x)
+    x = tokenfeed.process_stream(x)
 
-# Note: nothing has actually executed yet.
+    # Note: nothing has actually executed yet.
 
-x = list(x)
+    x = list(x)
 
-# Note: now it has.
+    # Note: now it has.
 
-pprint.pprint(x)
-print()
+    pprint.pprint(x)
+    print()
 
 
 